@@ -0,0 +1,291 @@
+"""Benchmark suite for features, sources and sinks.
+
+Runs the extraction for a matrix of source, sink, feature set, blocksize,
+overlap, channel count and signal length with synthetic signals (arrays
+and generated WAV files), so it runs offline.
+Reports frames per second, the real-time factor (signal duration divided
+by extraction time) and the peak memory traced during extraction.
+
+Results can be saved as JSON and compared with a stored baseline::
+
+    python benchmarks/bench.py --quick --save baseline.json
+    python benchmarks/bench.py --quick --compare baseline.json
+
+Comparing exits with status 1 if a case got slower than the threshold.
+
+The per block overhead of the extraction is measured with trivial
+features and a sink dropping the results::
+
+    python benchmarks/bench.py --source array --sink null \\
+        --features overhead --blocksize 1 --overlap 0 --channels 1
+
+"""
+
+import argparse
+import itertools
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+
+from sigfeat import Extractor
+from sigfeat import feature as fts
+from sigfeat.base import Feature
+from sigfeat.base import Parameter
+from sigfeat.base import Sink
+from sigfeat.source.array import ArraySource
+from sigfeat.sink import DefaultDictSink
+
+
+SAMPLERATE = 44100
+
+
+def small_features():
+    return [
+        fts.Peak(),
+        fts.RootMeanSquare(),
+        fts.ZeroCrossingRate()]
+
+
+def medium_features():
+    return small_features() + [
+        fts.SpectralCentroid(),
+        fts.SpectralFlatness(),
+        fts.SpectralFlux()]
+
+
+def large_features():
+    return medium_features() + [
+        fts.CrestFactor(),
+        fts.SpectralSpread(),
+        fts.SpectralSkewness(),
+        fts.SpectralKurtosis(),
+        fts.SpectralRolloff(),
+        fts.SpectralCrestFactor(),
+        fts.SpectralSlope(),
+        fts.MFCC()]
+
+
+class Constant(Feature):
+    value = Parameter(0.0)
+
+    def process(self, data, result):
+        return self.value
+
+
+class Sum(Feature):
+    def on_start(self, source, featureset, sink):
+        self.required = self._requirements[0].name
+
+    def process(self, data, result):
+        return result[self.required] + 1.0
+
+
+def overhead_features():
+    """Trivial features measuring the per block overhead of the
+    extraction, e.g. with ``--blocksize 1 --sink null``."""
+    hidden = [
+        Constant(name='hidden{}'.format(i), value=float(i)).hide()
+        for i in range(5)]
+    return hidden + [
+        Sum(name='sum{}'.format(i), requirements=[hidden[i % 5]])
+        for i in range(10)]
+
+
+FEATURESETS = {
+    'small': small_features,
+    'medium': medium_features,
+    'large': large_features,
+    'overhead': overhead_features,
+}
+
+
+def make_signal(duration, channels, seed=0):
+    rnd = np.random.RandomState(seed)
+    x = 0.1 * rnd.randn(int(duration * SAMPLERATE), channels)
+    if channels == 1:
+        x = x[:, 0]
+    return x
+
+
+def make_source(kind, signal, tmpdir, **parameters):
+    if kind == 'array':
+        return ArraySource(signal, samplerate=SAMPLERATE, **parameters)
+    elif kind == 'soundfile':
+        from soundfile import write
+        from sigfeat.source.soundfile import SoundFileSource
+        path = os.path.join(tmpdir, '{}_{}.wav'.format(
+            len(signal), np.size(signal) // len(signal)))
+        if not os.path.exists(path):
+            write(path, signal, SAMPLERATE)
+        return SoundFileSource(path, **parameters)
+    raise ValueError('Unknown source {}'.format(kind))
+
+
+class NullSink(Sink):
+    """Sink dropping all data."""
+    def receive(self, datad):
+        pass
+
+    def receive_append(self, resultd):
+        pass
+
+
+def make_sink(kind, tmpdir):
+    if kind == 'defaultdict':
+        return DefaultDictSink()
+    elif kind == 'null':
+        return NullSink()
+    elif kind == 'hdf5':
+        from sigfeat.sink.hdf5 import Hdf5Sink
+        return Hdf5Sink(os.path.join(tmpdir, 'sink.h5'), 'w')
+    raise ValueError('Unknown sink {}'.format(kind))
+
+
+def close_sink(sink):
+    if hasattr(sink, 'close'):
+        sink.close()
+
+
+def run_case(case, tmpdir, repeat):
+    """Returns the measures of one benchmark case."""
+    signal = make_signal(case['duration'], case['channels'])
+    parameters = dict(
+        blocksize=case['blocksize'],
+        overlap=int(case['blocksize'] * case['overlap']))
+    blockshift = parameters['blocksize'] - parameters['overlap']
+    frames = max(0, (len(signal) - parameters['blocksize'])) // blockshift + 1
+
+    def extract():
+        extractor = Extractor(*FEATURESETS[case['features']]())
+        source = make_source(case['source'], signal, tmpdir, **parameters)
+        sink = make_sink(case['sink'], tmpdir)
+        start = time.perf_counter()
+        extractor.extract(source, sink, batchsize=case['batchsize'])
+        elapsed = time.perf_counter() - start
+        close_sink(sink)
+        return elapsed
+
+    elapsed = min(extract() for _ in range(repeat))
+    tracemalloc.start()
+    extract()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return {
+        'time': elapsed,
+        'frames_per_second': frames / elapsed,
+        'realtime_factor': case['duration'] / elapsed,
+        'peak_memory': peak,
+    }
+
+
+def case_key(case):
+    return ' '.join('{}={}'.format(k, case[k]) for k in sorted(case))
+
+
+def gen_cases(args):
+    names = ['source', 'sink', 'features', 'blocksize', 'overlap',
+             'channels', 'duration', 'batchsize']
+    values = [getattr(args, name) for name in names]
+    for combination in itertools.product(*values):
+        yield dict(zip(names, combination))
+
+
+def available_sinks(sinks):
+    for sink in sinks:
+        if sink == 'hdf5':
+            try:
+                import h5py  # noqa: F401
+            except ImportError:
+                print('Skipping hdf5 sink, h5py is not installed.')
+                continue
+        yield sink
+
+
+def compare(results, baseline, threshold):
+    """Prints the comparison and returns the keys of regressed cases."""
+    regressions = []
+    for key, measures in results.items():
+        if key not in baseline:
+            continue
+        ratio = (measures['frames_per_second'] /
+                 baseline[key]['frames_per_second'])
+        flag = ''
+        if ratio < 1 - threshold:
+            flag = ' REGRESSION'
+            regressions.append(key)
+        print('{:6.2f}x  {}{}'.format(ratio, key, flag))
+    return regressions
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--source', nargs='+', default=['array', 'soundfile'])
+    parser.add_argument('--sink', nargs='+', default=['defaultdict', 'hdf5'],
+                        help='defaultdict, hdf5 or null.')
+    parser.add_argument(
+        '--features', nargs='+', default=['large', 'medium', 'small'],
+        help='small, medium, large or overhead.')
+    parser.add_argument('--blocksize', nargs='+', type=int,
+                        default=[512, 2048])
+    parser.add_argument('--overlap', nargs='+', type=float,
+                        default=[0.0, 0.5],
+                        help='Overlap as ratio of the blocksize.')
+    parser.add_argument('--channels', nargs='+', type=int, default=[1, 2])
+    parser.add_argument('--duration', nargs='+', type=float, default=[10.0],
+                        help='Signal length in seconds.')
+    parser.add_argument('--batchsize', nargs='+', type=int, default=[0],
+                        help='0 extracts block by block.')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--quick', action='store_true',
+                        help='Small matrix with short signals.')
+    parser.add_argument('--save', help='Save results as JSON.')
+    parser.add_argument('--compare', help='Compare with JSON baseline.')
+    parser.add_argument('--threshold', type=float, default=0.1,
+                        help='Relative slowdown reported as regression.')
+    args = parser.parse_args(argv)
+    if args.quick:
+        args.sink = ['defaultdict']
+        args.blocksize = [1024]
+        args.overlap = [0.5]
+        args.channels = [1]
+        args.duration = [2.0]
+    args.sink = list(available_sinks(args.sink))
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    results = {}
+    with tempfile.TemporaryDirectory() as tmpdir:
+        for case in gen_cases(args):
+            measures = run_case(case, tmpdir, args.repeat)
+            key = case_key(case)
+            results[key] = dict(case=case, **measures)
+            print('{frames_per_second:10.0f} frames/s {realtime_factor:8.1f}x '
+                  'realtime {peak_memory:12d} B  {key}'.format(
+                      key=key, **measures))
+
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump({
+                'python': sys.version,
+                'numpy': np.__version__,
+                'platform': platform.platform(),
+                'results': results}, f, indent=2)
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)['results']
+        if compare(results, baseline, args.threshold):
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -2,8 +2,6 @@
 
 :py:class:`Feature` is subclassed for implementing Signal Features.
 
-TODO: What happens if i have a hidden feature but add a instance of tha same
-that is not hidden? Mus be solved in the FeatureSet!
 TODO: Handle labels for multidimensional feature output.
 
 """
@@ -14,7 +12,9 @@ import six
 from inspect import isclass
 from collections import OrderedDict
 from .parameter import ParameterMixin
+from .parameter import Parameter
 from .metadata import MetadataMixin
+from .result import Result
 
 
 @six.add_metaclass(abc.ABCMeta)
@@ -26,6 +26,9 @@ class Feature(ParameterMixin, MetadataMixin):
     name : str
     requirements : Feature instances iterable
         To override those returned by self.requires().
+    every : int
+        The feature is only processed for every ``every``-th block,
+        see :py:class:`Decimation`.
 
     Notes
     -----
@@ -34,10 +37,21 @@ class Feature(ParameterMixin, MetadataMixin):
     you must override the :py:meth:`requires` method returning an iterable
     e.g. list of feature instances.
 
+    If your feature keeps a state from block to block, set ``_warmup``
+    to the number of preceding blocks needed to reproduce a result.
+    E.g. if the source is extracted in chunks, each chunk starts
+    ``warmup`` blocks earlier. If it can be gated (see :py:meth:`gated`),
+    override :py:meth:`skip` to handle the skipped blocks.
+
     """
     _hidden = False
+    _warmup = 0
+    _gate = None
+    _fill = float('nan')
+    _every = 1
+    _compact = False
 
-    def __init__(self,  name=None, requirements=None, **parameters):
+    def __init__(self,  name=None, requirements=None, every=1, **parameters):
         """Returns a Feature instance.
 
         Provide feature-parameters as keyword arguments.
@@ -49,6 +63,7 @@ class Feature(ParameterMixin, MetadataMixin):
             #     if self.name.default:
             #         name = self.name.default
         self.name = name
+        self._every = int(every)
         if requirements:
             self._requirements = list(requirements)
         else:
@@ -114,6 +129,63 @@ class Feature(ParameterMixin, MetadataMixin):
         """
         raise NotImplementedError  # pragma: no cover
 
+    def process_batch(self, data, results):
+        """Override this method to process a whole batch of blocks at once.
+
+        The data from ``Source.generate_batches()`` will be in
+        ``data`` (usually ``data = blocks,indices,...,``) where the first
+        axis of each element is the frame axis.
+        The default implementation calls :py:meth:`process` for each frame.
+
+        Parameters
+        ----------
+        data : blocks, indices
+            Or the stacked data generated from your source.
+        results : Result
+            The results from other features of the current batch.
+            Each result holds one item per frame along the first axis.
+
+        Returns
+        -------
+        res : sequence e.g. list or ndarray
+            The feature results with one item per frame.
+
+        """
+        result = Result()
+        outputs = []
+        items = list(results.items())
+        for i, framedata in enumerate(zip(*data)):
+            for name, values in items:
+                result._setitem(name, values[i])
+            outputs.append(self.process(framedata, result))
+        return outputs
+
+    def skip(self, data, result):
+        """Is called instead of :py:meth:`process` if the block is skipped
+        by the gate of the feature.
+
+        Override this method if your feature keeps a state from block to
+        block, e.g. to restart after skipped blocks.
+
+        Returns
+        -------
+        fill : The fill value of the feature.
+
+        """
+        return self._fill
+
+    def restart(self):
+        """Is called before the first block of each new segment of a
+        segmented source, e.g. each file of a
+        :py:class:`sigfeat.source.corpus.CorpusSource`.
+
+        Override this method if your feature keeps a state from block to
+        block. Reset it like at the start, ``on_start`` is not called
+        again.
+
+        """
+        pass
+
     def on_finished(self, source, featureset, sink):
         """Override this method to be run after extraction.
 
@@ -158,26 +230,33 @@ class Feature(ParameterMixin, MetadataMixin):
                 yield dep
 
     def featureset(self, new=False, autoinst=False, err_missing=True):
-        """Returns an ordered dict of all features unique in name.
+        """Returns the FeatureSet of this feature and its requirements.
 
-        The dict is ordered by the dependency tree order.
+        The FeatureSet is ordered by the dependency tree order and keyed
+        like by :py:func:`features_to_featureset`. Feature classes in the
+        requirements are resolved to instances of the class required
+        before as well.
 
         Parameters
         ----------
         new : boolean
             All features will be reinitialized.
+        autoinst : boolean
+            Missing feature classes are instantiated.
+        err_missing : boolean
+            If False, missing feature classes are instantiated as well.
 
         Returns
         -------
-        featdict : OrderedDict
-            Keys are ``fid`` and values are feature instances.
+        featureset : FeatureSet
+            Keys are the names and values are feature instances.
 
         """
-        deps = reversed(tuple(
-            self.gen_dependencies_instances(autoinst, err_missing)))
-        if new:
-            deps = [d.new() for d in deps]
-        return OrderedDict((feat.name, feat) for feat in deps)
+        return FeatureSet(
+            [self],
+            new=new,
+            autoinst=autoinst or not err_missing,
+            bytype=True)
 
     def validate_name(self):
         """Checks for uniqueness of feature name in all dependent features."""
@@ -197,13 +276,52 @@ class Feature(ParameterMixin, MetadataMixin):
 
     def new(self):
         """Returns new initial feature instance with same parameters."""
-        return self.__class__(**dict(self.parameters))
+        return self._inherit(self.__class__(
+            name=self.name,
+            requirements=self._requirements,
+            **dict(self.parameters)))
+
+    def _inherit(self, feature):
+        """Returns given feature hidden, decimated and gated like this
+        feature."""
+        feature.hide(self.hidden)
+        feature._every = self._every
+        if self._gate is not None:
+            feature.gated(self._gate.new(), self._fill)
+        return feature
 
     def hide(self, b=True):
         """Hide the feature."""
         self._hidden = bool(b)
         return self
 
+    def gated(self, gate, fill=float('nan')):
+        """Skip the feature on blocks marked by the gate feature.
+
+        The gate is processed first and its result is true for blocks
+        to skip, e.g. :py:class:`sigfeat.feature.Silence`. For skipped
+        blocks :py:meth:`skip` is called instead of :py:meth:`process`
+        and the fill value is the result. Features depending on a gated
+        feature and hidden features only required by gated features are
+        skipped as well.
+
+        The number of skipped blocks is added to the metadata of the
+        gate as ``'skipped'``.
+
+        Parameters
+        ----------
+        gate : Feature instance
+        fill : The result of skipped blocks.
+
+        Returns
+        -------
+        self : The gated feature.
+
+        """
+        self._gate = gate
+        self._fill = fill
+        return self
+
     @property
     def fid(self):
         """Returns the feature identifying tuple."""
@@ -214,6 +332,26 @@ class Feature(ParameterMixin, MetadataMixin):
         """Returns whether the feature is hidden or not."""
         return self._hidden
 
+    @property
+    def compact(self):
+        """Returns whether the result of some blocks is ``SKIPPED``.
+
+        Those results are left out of the visible results like the
+        results of decimated features.
+
+        """
+        return self._compact
+
+    @property
+    def every(self):
+        """Returns the decimation factor of the feature."""
+        return self._every
+
+    @property
+    def warmup(self):
+        """Returns the number of preceding blocks the feature depends on."""
+        return self._warmup
+
     def __repr__(self):
         return "".join(self.fid)
 
@@ -222,28 +360,272 @@ class HiddenFeature(Feature):
     _hidden = True
 
 
-def _validate_featureset(featureset):
-    """Returns true if all required feature instances are available.
-    Else raises an error."""
-    for name, feature in featureset.items():
-        for req in feature.requires():
-            if hasattr(req, 'name') and isinstance(req.name, str):
-                name = req.name
-            else:
+class Decimation(HiddenFeature):
+    """Gate skipping all blocks except every ``factor``-th block.
+
+    Is added to the featureset for features with ``every > 1``.
+    The blocks are counted from index 0 of the source, so the kept blocks
+    do not depend on where the extraction starts e.g. in chunks.
+
+    Parameters
+    ----------
+    factor : int
+
+    """
+    factor = Parameter(1)
+
+    def on_start(self, source, featureset, sink):
+        self._blockshift = source.blocksize - source.overlap
+
+    def process(self, data, result):
+        return data[1] // self._blockshift % self.factor != 0
+
+    def process_batch(self, data, results):
+        return [
+            index // self._blockshift % self.factor != 0
+            for index in data[1]]
+
+
+class DecimatedIndex(Feature):
+    """Index of the blocks of a decimated feature.
+
+    Is added to the featureset as ``<name>_index`` for visible features
+    with ``every > 1``.
+
+    """
+    def process(self, data, result):
+        return data[1]
+
+    def process_batch(self, data, results):
+        return list(data[1])
+
+
+class FeatureSet(OrderedDict):
+    """Ordered dict of the features of an extraction.
+
+    The features are ordered by the dependency tree order and are unique
+    in their identity: the ``fid`` and the identities of their required
+    features. So identical features required by several features (e.g.
+    one Rfft with the same nfft and window) are processed once, even if
+    they are registered under different names.
+
+    Of identical features with equal names the first one is kept, e.g.
+    a hidden feature stays hidden if a required instance is not hidden.
+
+    Names are the labels of the results. Of features with equal names
+    the first one is kept, if one of them is visible. Hidden features of
+    different identity but equal name get unique keys (``name#2``, ...)
+    and each feature reads the results of its own requirements by their
+    names, see :py:meth:`scoped`.
+
+    Feature classes in the requirements are resolved by the class name,
+    first within the requirements of the feature, then in the featureset.
+
+    Parameters
+    ----------
+    features : iterable
+    new : reinitialize features as new instances.
+    autoinst : auto initialize missing feature classes if required.
+    bytype : resolve feature classes to features of the featureset being
+        instances of the class as well, if none has the class name.
+
+    Attributes
+    ----------
+    requirements : dict
+        Keys of the directly required features for each key.
+    scopes : dict
+        For each key, the dict of names the feature reads under another
+        key.
+    aliases : dict
+        For each key of a feature identical to another one registered
+        under another name, the key of the feature processed instead.
+    gates : dict
+        For each key of a gated feature the key of its gate.
+    decimations : dict
+        For each key of a decimated feature the key of its
+        :py:class:`Decimation`.
+
+    """
+    def __init__(self, features=(), new=False, autoinst=False, bytype=False):
+        super(FeatureSet, self).__init__()
+        self.bytype = bytype
+        self.requirements = {}
+        self.scopes = {}
+        self.aliases = {}
+        self.gates = {}
+        self.decimations = {}
+        self._trees = {}
+        self._keys = {}
+        for feature in features:
+            self.add(feature, new=new, autoinst=autoinst)
+
+    def add(self, feature, new=False, autoinst=False):
+        """Adds the feature and its requirements and returns its key."""
+        if new:
+            feature = feature.new()
+        existing = self.get(feature.name)
+        if existing is not None and not (feature.hidden and existing.hidden):
+            return feature.name
+        if feature._requirements:
+            requirements = feature._requirements
+        else:
+            requirements = feature.requires()
+
+        gatekey = None
+        if feature._gate is not None:
+            gatekey = self.add(feature._gate, new=new, autoinst=autoinst)
+        decimationkey = None
+        if feature.every > 1:
+            decimationkey = self.add(Decimation(factor=feature.every))
+
+        tree = {}
+        reqkeys = []
+        for req in requirements:
+            if isclass(req):
                 name = req.__name__
+                key = self._find(req, tree)
+                if key is None:
+                    if not autoinst:
+                        raise ValueError(
+                            'You must provide a feature instance of {} '
+                            'or try set autoinst=True if defaults are '
+                            'ok.'.format(req))
+                    key = self.add(req(), autoinst=autoinst)
+            else:
+                name = req.name
+                key = self.add(req, new=new, autoinst=autoinst)
+            reqkeys.append(key)
+            tree.update(self._trees[key])
+            tree[self[key].name] = key
+            tree[name] = key
+
+        if gatekey is not None:
+            reqkeys.append(gatekey)
+        if decimationkey is not None:
+            reqkeys.append(decimationkey)
+        uid = feature.fid, tuple(reqkeys)
+        key = self._keys.get(uid)
+        if key is not None:
+            existing = self[key]
+            if feature.name == existing.name:
+                return key
+            elif self.aliases.get(feature.name) == key:
+                return feature.name
+            alias = self._newkey(feature)
+            self[alias] = feature
+            self.aliases[alias] = key
+            self.requirements[alias] = [key]
+            self.scopes[alias] = {}
+            self._trees[alias] = dict(self._trees[key], **{existing.name: key})
+            self._add_index(alias, feature)
+            return alias
+
+        key = self._newkey(feature)
+        self[key] = feature
+        self._keys[uid] = key
+        if gatekey is not None:
+            self.gates[key] = gatekey
+        if decimationkey is not None:
+            self.decimations[key] = decimationkey
+        self.requirements[key] = reqkeys
+        self.scopes[key] = {n: k for n, k in tree.items() if n != k}
+        self._trees[key] = tree
+        self._add_index(key, feature)
+        return key
+
+    def _add_index(self, key, feature):
+        """Adds the index of a visible decimated feature."""
+        if (feature.every > 1 and not feature.hidden and
+                not isinstance(feature, DecimatedIndex)):
+            self.add(DecimatedIndex(name=key + '_index', every=feature.every))
+
+    def _find(self, cls, tree):
+        """Returns the key a feature class requirement resolves to."""
+        name = cls.__name__
+        key = tree.get(name, name if name in self else None)
+        if key is None and self.bytype:
+            key = next(
+                (k for k, f in self.items() if isinstance(f, cls)), None)
+        return key
+
+    def _newkey(self, feature):
+        name = feature.name
+        if name not in self:
+            return name
+        count = 2
+        while '{}#{}'.format(name, count) in self:
+            count += 1
+        return '{}#{}'.format(name, count)
+
+    def scoped(self, key):
+        """Returns the featureset as seen by the feature of key.
+
+        The names of the requirements of the feature map to their
+        features, e.g. for ``on_start``.
 
-            if name not in featureset:
-                raise ValueError(
-                    'You must provide a feature instance of {} '
-                    'or try set autoinst=True if defaults are ok.'.format(
-                        req))
-    return featureset
+        """
+        if not self.scopes[key]:
+            return self
+        featureset = OrderedDict(self)
+        for name, k in self.scopes[key].items():
+            featureset[name] = self[k]
+        return featureset
+
+    def gating(self):
+        """Returns dict of the gate key for each feature to be gated.
+
+        Besides the gated features, these are the features depending on
+        a gated feature and the hidden features only required by features
+        of the same gate.
+
+        """
+        return self._propagate(self.gates)
+
+    def decimation(self):
+        """Returns dict of the Decimation key for each feature to be
+        decimated, propagated like :py:meth:`gating`."""
+        return self._propagate(self.decimations)
+
+    def _propagate(self, gates):
+        gating = dict(gates)
+        for key in self:
+            for req in self.requirements[key]:
+                if key not in gating and req in gating:
+                    gating[key] = gating[req]
+        dependents = {key: [] for key in self}
+        for key in self:
+            for req in self.requirements[key]:
+                dependents[req].append(key)
+        positions = {key: i for i, key in enumerate(self)}
+        for key in reversed(self):
+            gates = set(gating.get(dep) for dep in dependents[key])
+            if (key not in gating and self[key].hidden and
+                    len(gates) == 1 and None not in gates):
+                gate = gates.pop()
+                if positions[gate] < positions[key]:
+                    gating[key] = gate
+        return gating
+
+    def subset(self, keys):
+        """Returns a FeatureSet of the given keys in the same order."""
+        subset = FeatureSet(bytype=self.bytype)
+        for key, feature in self.items():
+            if key in keys:
+                subset[key] = feature
+                for attr in ('requirements', 'scopes', 'aliases', 'gates',
+                             'decimations', '_trees'):
+                    mapping = getattr(self, attr)
+                    if key in mapping:
+                        getattr(subset, attr)[key] = mapping[key]
+        subset._keys = {
+            uid: key for uid, key in self._keys.items() if key in subset}
+        return subset
 
 
 def features_to_featureset(features,
                            new=False,
                            autoinst=False):
-    """Returns a featureset of given features distinct in names.
+    """Returns a FeatureSet of given features and their requirements.
 
     Parameters
     ----------
@@ -252,12 +634,4 @@ def features_to_featureset(features,
     autoinst : auto initialize missing feature classes if required.
 
     """
-    featsets = (feat.featureset(
-        new=new,
-        autoinst=autoinst,
-        err_missing=False) for feat in reversed(features))
-    featureset = next(featsets)
-    for fset in featsets:
-        featureset.update(fset)
-
-    return _validate_featureset(featureset)
+    return FeatureSet(features, new=new, autoinst=autoinst)
@@ -9,6 +9,8 @@ extractor or another Preprocess.
 import abc
 import six
 
+from hashlib import sha1
+
 from .source import Source
 
 
@@ -36,6 +38,13 @@ class Preprocess(Source):
         src_params.update(parameters)
         self.unroll_parameters(src_params)
 
+    def content_hash(self):
+        """Returns hash of the source content and this preprocess."""
+        return sha1(repr((
+            self.source.content_hash(),
+            self.__class__.__name__,
+            str(self.parameters))).encode()).hexdigest()
+
     def generate(self):
         for data in self.source:
             yield self.process(data)  # pragma: no coverage
@@ -1,3 +1,6 @@
+from collections.abc import Mapping
+
+
 class Result(dict):
     """Result dict. Behaves 'immutable' to the Feature.process method.
 
@@ -11,3 +14,40 @@ class Result(dict):
 
     def _setitem(self, key, value):
         dict.__setitem__(self, key, value)
+
+
+class _Skipped(object):
+    """Result of a feature not processed for a block."""
+    __slots__ = ()
+
+    def __repr__(self):
+        return 'SKIPPED'
+
+    def __reduce__(self):
+        return 'SKIPPED'
+
+
+SKIPPED = _Skipped()
+
+
+class ScopedResult(Mapping):
+    """Read only view of a Result for a feature with a scope.
+
+    Names of the scope are translated to the keys the results are stored
+    under, see :py:meth:`sigfeat.base.feature.FeatureSet.scoped`.
+
+    """
+    __slots__ = ('_result', '_scope')
+
+    def __init__(self, result, scope):
+        self._result = result
+        self._scope = scope
+
+    def __getitem__(self, name):
+        return self._result[self._scope.get(name, name)]
+
+    def __iter__(self):
+        return iter(self._result)
+
+    def __len__(self):
+        return len(self._result)
@@ -17,3 +17,12 @@ class Sink(object):
     def receive_append(self, resultd):
         """Shall receive result dictionaries appending data to fields."""
         pass  # pragma: no coverage
+
+    def receive_segment(self, segment):
+        """Is called before the results of each new segment of a
+        segmented source, e.g. with the file id of a CorpusSource.
+
+        Override this method to segment the results.
+
+        """
+        pass
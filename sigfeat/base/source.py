@@ -15,6 +15,14 @@ class Source(ParameterMixin, MetadataMixin):
     returning a generator that yields the signal blocks.
     Source must have samplerate and channels as metadata.
 
+    A source with ``segmented = True`` yields ``(block, index, segment)``
+    where blocks of a new segment (e.g. the next file) do not continue
+    the signal of the blocks before. Before each new segment the
+    extractor restarts the features (see
+    :py:meth:`sigfeat.base.Feature.restart`) and calls
+    ``sink.receive_segment(segment)``. A batch must not contain blocks
+    of several segments.
+
     Parameters
     ----------
     blocksize : int
@@ -25,6 +33,7 @@ class Source(ParameterMixin, MetadataMixin):
     """
     blocksize = Parameter(default=1024)
     overlap = Parameter(default=0)
+    segmented = False
 
     def __init__(self, **parameters):
         self.unroll_parameters(parameters)
@@ -43,3 +52,75 @@ class Source(ParameterMixin, MetadataMixin):
 
         """
         return NotImplemented
+
+    def framecount(self):
+        """Override this method returning the number of generated blocks.
+
+        Needed for extraction in chunks.
+
+        """
+        raise NotImplementedError(
+            '{} does not provide a framecount.'.format(
+                self.__class__.__name__))
+
+    def chunk(self, start, stop):
+        """Override this method returning a source of a range of blocks.
+
+        The returned source must generate the blocks ``start`` until
+        ``stop`` (exclusive) of this source with the same indices.
+        Needed for extraction in chunks.
+
+        Parameters
+        ----------
+        start : int
+            Number of the first block.
+        stop : int
+            Number of the block after the last block.
+
+        """
+        raise NotImplementedError(
+            '{} can not be split into chunks.'.format(
+                self.__class__.__name__))
+
+    def content_hash(self):
+        """Override this method returning a hash string of the content.
+
+        Needed for caching results, see :py:mod:`sigfeat.cache`.
+
+        """
+        raise NotImplementedError(
+            '{} does not provide a content hash.'.format(
+                self.__class__.__name__))
+
+    def generate_batches(self, batchsize):
+        """Returns generator that yields batches of stacked ``data``.
+
+        Up to ``batchsize`` consecutive items from ``.generate()``
+        are stacked along a new first axis, so ``(block, index)``
+        becomes ``(blocks, indices)``. Batches of a segmented source end
+        with the segment.
+        Override this method if your source can provide batches directly.
+
+        Parameters
+        ----------
+        batchsize : int
+            Maximum number of blocks per batch.
+
+        """
+        batch = []
+        for data in self.generate():
+            if batch and self.segmented and data[2] != batch[-1][2]:
+                yield _stack(batch)
+                batch = []
+            batch.append(data)
+            if len(batch) == batchsize:
+                yield _stack(batch)
+                batch = []
+        if batch:
+            yield _stack(batch)
+
+
+def _stack(batch):
+    """Returns tuple of arrays stacking the items of given data tuples."""
+    import numpy as np  # the base framework does not depend on numpy
+    return tuple(np.stack(items) for items in zip(*batch))
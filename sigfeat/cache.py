@@ -0,0 +1,193 @@
+"""This module implements a persistent on-disk cache of feature results.
+
+Results of each visible feature are stored as one column file per source.
+The key of a column is built from the content hash of the source, the
+source parameters (e.g. blocksize and overlap) and the ``fid`` of the
+feature and all features it depends on.
+On a rerun only the missing features and their requirements are
+extracted, cached columns are loaded into the sink.
+
+If the total size of the cache exceeds ``maxsize`` bytes, the least
+recently used columns are deleted.
+
+Example
+-------
+
+.. code:
+
+    cache = FeatureCache('/data/featurecache', maxsize=10*2**30)
+    sink = extractor.extract(source, DefaultDictSink(), cache=cache)
+
+"""
+
+import os
+import pickle
+import tempfile
+
+from collections import OrderedDict
+from hashlib import sha1
+
+from .base.result import SKIPPED
+from .plan import ExtractionPlan
+from .scheduler import FeatureGraph
+
+
+def _requirement_closure(graph, names):
+    """Returns set of names and all names they (transitively) require."""
+    closure = set()
+    stack = list(names)
+    while stack:
+        name = stack.pop()
+        if name not in closure:
+            closure.add(name)
+            stack.extend(graph.requirements[name])
+    return closure
+
+
+def _row(columns, names, i):
+    """Returns the results of block i, without skipped results."""
+    return OrderedDict(
+        (name, columns[name][i]) for name in names
+        if columns[name][i] is not SKIPPED)
+
+
+class FeatureCache(object):
+    """Persistent cache of feature result columns.
+
+    Parameters
+    ----------
+    directory : str
+        Directory of the cache files, is created if needed.
+    maxsize : int
+        Maximum size of all cache files in bytes, None is unlimited.
+
+    """
+    suffix = '.pkl'
+
+    def __init__(self, directory, maxsize=None):
+        self.directory = directory
+        self.maxsize = maxsize
+        os.makedirs(directory, exist_ok=True)
+
+    def keys(self, source, featureset):
+        """Returns dict of cache keys for each feature key."""
+        graph = FeatureGraph(featureset)
+        sourcekey = repr((source.content_hash(), str(source.parameters)))
+        keys = OrderedDict()
+        for name in featureset:
+            fids = sorted(
+                featureset[dep].fid
+                for dep in _requirement_closure(graph, [name]))
+            keys[name] = sha1(
+                repr((sourcekey, featureset[name].fid, fids)).encode()
+            ).hexdigest()
+        return keys
+
+    def _path(self, key):
+        return os.path.join(self.directory, key + self.suffix)
+
+    def load(self, key):
+        """Returns the cached column of key or None."""
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as f:
+                column = pickle.load(f)
+        except (OSError, EOFError, pickle.UnpicklingError):
+            return None
+        os.utime(path)
+        return column
+
+    def store(self, key, column):
+        """Stores the column under key and evicts old columns."""
+        fd, tmppath = tempfile.mkstemp(dir=self.directory)
+        with os.fdopen(fd, 'wb') as f:
+            pickle.dump(column, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmppath, self._path(key))
+        self.evict()
+
+    def size(self):
+        """Returns the total size of the cached columns in bytes."""
+        return sum(size for path, mtime, size in self._entries())
+
+    def _entries(self):
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith(self.suffix):
+                try:
+                    stat = entry.stat()
+                except OSError:
+                    continue
+                yield entry.path, stat.st_mtime, stat.st_size
+
+    def evict(self):
+        """Deletes least recently used columns until maxsize is kept."""
+        if self.maxsize is None:
+            return
+        entries = sorted(self._entries(), key=lambda e: e[1])
+        total = sum(size for path, mtime, size in entries)
+        for path, mtime, size in entries:
+            if total <= self.maxsize:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+
+    def clear(self):
+        """Deletes all cached columns."""
+        for path, mtime, size in list(self._entries()):
+            os.remove(path)
+
+    def extract(self, extractor, source, sink, batchsize=None):
+        """Extracts the features of extractor not yet cached into sink.
+
+        Parameters
+        ----------
+        extractor : Extractor instance
+        source : Source instance
+            Must implement ``content_hash()``.
+        sink : Sink instance
+        batchsize : int
+            See :py:meth:`Extractor.extract`.
+
+        Returns
+        -------
+        res : Sink
+            The sink with processed data and metadata.
+
+        """
+        featureset = extractor.featureset
+        keys = self.keys(source, featureset)
+        visible = [n for n, f in featureset.items() if not f.hidden]
+        columns = OrderedDict()
+        missing = []
+        for name in visible:
+            column = self.load(keys[name])
+            if column is None:
+                missing.append(name)
+            else:
+                columns[name] = column
+
+        required = _requirement_closure(FeatureGraph(featureset), missing)
+        subset = featureset.subset(required)
+        skipped = None
+        if subset:
+            extractor._start(source, sink, subset)
+            plan = ExtractionPlan(subset, batch=bool(batchsize))
+            skipped = plan.skipped
+            results = extractor._extract(source, batchsize, plan=plan)
+            for name in missing:
+                columns[name] = []
+            for i, result in enumerate(results):
+                plan.count_skipped(result)
+                for name in missing:
+                    columns[name].append(result[name])
+                sink.receive_append(_row(columns, visible, i))
+            for name in missing:
+                self.store(keys[name], columns[name])
+        elif columns:
+            for i in range(len(next(iter(columns.values())))):
+                sink.receive_append(_row(columns, visible, i))
+
+        extractor._finish(source, sink, subset, skipped=skipped)
+        return sink
@@ -6,8 +6,16 @@ Sink.
 
 """
 
+from concurrent.futures import ThreadPoolExecutor
+
 from .base.result import Result
+from .base.result import SKIPPED
 from .base.feature import features_to_featureset
+from .parallel import extract_many
+from .parallel import extract_chunked
+from .plan import ExtractionPlan
+from .profiling import Profile
+from .scheduler import ThreadedExecutor
 
 
 class Extractor(object):
@@ -24,6 +32,9 @@ class Extractor(object):
         in featureset.
         If False you will get errors with a hint
         which feature instance you need provide as well.
+    groups : iterable of FeatureGroup
+        Features extracted with other blocksizes and overlaps from the
+        samples of the same source, see :py:mod:`sigfeat.multires`.
 
     Example
     -------
@@ -33,29 +44,107 @@ class Extractor(object):
         extractor = Extractor(feat1, feat2, ..., featN)
 
     """
-    def __init__(self, *features, autoinst=True):
+    def __init__(self, *features, autoinst=True, groups=()):
         self._features = features
+        self._autoinst = autoinst
         self.featureset = features_to_featureset(
             self._features, autoinst=autoinst)
+        self.groups = tuple(groups)
+        self._group_extractors = tuple(
+            Extractor(*group.features, autoinst=autoinst)
+            for group in self.groups)
 
-    def _extract(self, source):
+    def _extract(self,
+                 source,
+                 batchsize=None,
+                 threads=None,
+                 plan=None,
+                 profile=None,
+                 sink=None):
         """Yields extracted results."""
-        result = Result()
-        for data in source:
-            for fid, feature in self.featureset.items():
-                output = feature.process(
-                    data,
-                    result)
-                result._setitem(feature.name, output)
-            yield result
-
-    def extract(self, source, sink=None):
+        if batchsize:
+            datas = source.generate_batches(batchsize)
+        else:
+            datas = source
+        if profile is not None:
+            datas = profile.source.iterate(datas)
+        if getattr(source, 'segmented', False):
+            datas = _restart_segments(
+                datas, self.featureset, sink, batch=bool(batchsize))
+        if self.groups:
+            from .multires import feed_groups
+            datas = feed_groups(
+                datas,
+                self.groups,
+                self._group_extractors,
+                source,
+                sink,
+                batch=bool(batchsize))
+        if threads:
+            yield from self._extract_threaded(
+                datas, batchsize, threads, profile)
+            return
+        if plan is None:
+            plan = ExtractionPlan(
+                self.featureset,
+                batch=bool(batchsize),
+                profile=profile)
+        if batchsize:
+            for data in datas:
+                yield from _split_batch(plan(data), len(data[0]))
+        else:
+            for data in datas:
+                yield plan(data)
+
+    def _extract_threaded(self, datas, batchsize, threads, profile):
+        """Yields extracted results processing independent features
+        concurrently."""
+        with ThreadPoolExecutor(threads) as pool:
+            executor = ThreadedExecutor(
+                self.featureset,
+                pool,
+                batch=bool(batchsize),
+                profile=profile)
+            if batchsize:
+                for data in datas:
+                    results = executor(data, Result())
+                    yield from _split_batch(results, len(data[0]))
+            else:
+                for data in datas:
+                    yield executor(data, Result())
+
+    def extract(self,
+                source,
+                sink=None,
+                batchsize=None,
+                threads=None,
+                profile=False,
+                cache=None):
         """Extracts features from given source into given sink.
 
         Parameters
         ----------
         source : Source instance
         sink : Sink instance
+        batchsize : int
+            If given, the source generates batches of ``batchsize`` blocks
+            and features process them at once by ``Feature.process_batch``.
+            The results are the same as without batches.
+        threads : int
+            If given, independent features of the dependency graph are
+            processed concurrently by a pool of ``threads`` threads.
+            See :py:mod:`sigfeat.scheduler`.
+        profile : bool
+            If True, the wall time and number of calls of each feature,
+            of the source generator and of ``sink.receive_append`` are
+            measured and received by the sink as ``'profile'`` with
+            the metadata (see :py:class:`sigfeat.profiling.Profile`).
+            Needs a sink.
+        cache : FeatureCache instance
+            If given, cached results are loaded and only missing features
+            are extracted and cached, see :py:mod:`sigfeat.cache`.
+            Needs a sink, threads and profile are not used.
+            Feature groups and segmented sources can not be cached.
 
         Returns
         -------
@@ -63,33 +152,185 @@ class Extractor(object):
             The sink with processed data and metadata.
 
         """
-        for fid, feature in self.featureset.items():
+        if self.groups and (sink is None or cache is not None):
+            raise ValueError(
+                'Feature groups need a sink and can not be cached.')
+        if profile and sink is None:
+            raise ValueError('Profiling needs a sink.')
+        if self.groups and getattr(source, 'segmented', False):
+            raise ValueError(
+                'Feature groups can not be extracted from segmented sources.')
+        if cache is not None and getattr(source, 'segmented', False):
+            raise ValueError('Segmented sources can not be cached.')
+        if cache is not None:
+            return cache.extract(self, source, sink, batchsize=batchsize)
+
+        self._start(source, sink)
+
+        profile = Profile(self.featureset) if profile else None
+        plan = ExtractionPlan(
+            self.featureset,
+            batch=bool(batchsize),
+            profile=profile)
+        results = self._extract(
+            source, batchsize, threads, plan, profile, sink)
+        if sink is None:
+            return results
+        else:
+            receive_append = sink.receive_append
+            if profile is not None:
+                receive_append = profile.sink.timed(receive_append)
+            count_skipped = plan.count_skipped
+            for result in results:
+                count_skipped(result)
+                receive_append(plan.visible_results(result))
+
+        self._finish(source, sink, profile=profile, skipped=plan.skipped)
+        return sink
+
+    def extract_chunked(self,
+                        source,
+                        sink,
+                        chunks=None,
+                        workers=None,
+                        batchsize=None):
+        """Extracts features from chunks of one source in parallel processes.
+
+        The results are received by the sink in order and are the
+        same as from :py:meth:`extract`, see
+        :py:func:`sigfeat.parallel.extract_chunked` for the parameters.
+
+        Returns
+        -------
+        res : Sink
+            The sink with processed data and metadata.
+
+        """
+        if self.groups:
+            raise ValueError('Feature groups can not be extracted in chunks.')
+        self._start(source, sink)
+        segmented = getattr(source, 'segmented', False)
+        current = None
+        skipped = {}
+        for i, (segment, result) in enumerate(extract_chunked(
+                self,
+                source,
+                chunks=chunks,
+                workers=workers,
+                batchsize=batchsize,
+                segments=True,
+                skipped=skipped)):
+            if segmented and (i == 0 or segment != current):
+                sink.receive_segment(segment)
+                current = segment
+            sink.receive_append(result)
+        self._finish(source, sink, skipped=skipped)
+        return sink
+
+    def open_stream(self,
+                    samplerate,
+                    channels=1,
+                    blocksize=1024,
+                    overlap=0,
+                    sink=None,
+                    **parameters):
+        """Returns a push based Stream extracting the features.
+
+        Calls on_start of all features once, see :py:class:`Stream`.
+
+        Example
+        -------
+
+        .. code:
+
+            stream = extractor.open_stream(44100, 1, 1024, 512)
+            results = stream.push(samples)
+            stream.close()
+
+        """
+        from .stream import Stream
+        return Stream(
+            self,
+            samplerate,
+            channels=channels,
+            sink=sink,
+            blocksize=blocksize,
+            overlap=overlap,
+            **parameters)
+
+    def _start(self, source, sink, featureset=None):
+        """Calls on_start of all features (of featureset if given)."""
+        if featureset is None:
+            featureset = self.featureset
+        for key, feature in featureset.items():
             feature.on_start(
                 source,
-                self.featureset,
+                featureset.scoped(key),
                 sink)
 
-        if sink is None:
-            return self._extract(source)
-        else:
-            for result in self._extract(source):
-                sink.receive_append(self._pop_hidden(result))
+    def _finish(self,
+                source,
+                sink,
+                featureset=None,
+                profile=None,
+                skipped=None):
+        """Calls on_finished of all features (of featureset if given)
+        and sends metadata (and the profile if given) to sink.
 
-        for fid, feature in self.featureset.items():
+        The number of blocks skipped by each gate (if given) is added to
+        the metadata of the gate as ``'skipped'``.
+
+        """
+        if featureset is None:
+            featureset = self.featureset
+        for key, feature in featureset.items():
             feature.on_finished(
                 source,
-                self.featureset,
+                featureset.scoped(key),
                 sink)
+        for key, count in (skipped or {}).items():
+            featureset[key].add_metadata('skipped', count)
 
-        sink.receive({
+        if sink is None:
+            return
+
+        metadata = {
             'hiddenfeatures':
                 self.get_features_parameters_and_metadata(hidden=True),
             'features':
                 self.get_features_parameters_and_metadata(hidden=False),
             'source':
                 self.get_parameters_and_metadata(source)
-            })
-        return sink
+            }
+        if profile is not None:
+            metadata['profile'] = profile.as_dict()
+        sink.receive(metadata)
+
+    def extract_many(self,
+                     sources,
+                     sink_factory=None,
+                     workers=None,
+                     batchsize=None,
+                     return_sinks=True,
+                     **parameters):
+        """Extracts features from many sources in parallel processes.
+
+        See :py:func:`sigfeat.parallel.extract_many` for the parameters.
+
+        Returns
+        -------
+        results : generator
+            Yields ``(source, sink)`` tuples in order of completion.
+
+        """
+        return extract_many(
+            self,
+            sources,
+            sink_factory=sink_factory,
+            workers=workers,
+            batchsize=batchsize,
+            return_sinks=return_sinks,
+            **parameters)
 
     def reset(self):
         """Resets the states of features.
@@ -97,7 +338,20 @@ class Extractor(object):
         If a new source shall be processed this may be usefull or needed.
 
         """
-        self.featureset = features_to_featureset(self._features, new=True)
+        self.featureset = features_to_featureset(
+            self._features, new=True, autoinst=self._autoinst)
+        for extractor in self._group_extractors:
+            extractor.reset()
+
+    @property
+    def warmup(self):
+        """Returns the number of preceding blocks needed by all features."""
+        decimation = self.featureset.decimation()
+        return sum(
+            f.warmup * (self.featureset[decimation[k]].factor
+                        if k in decimation else 1)
+            for k, f in self.featureset.items()
+            if k not in self.featureset.aliases)
 
     @staticmethod
     def get_parameters_and_metadata(obj):
@@ -108,12 +362,38 @@ class Extractor(object):
 
     def get_features_parameters_and_metadata(self, hidden=False):
         """Returns dict with parameters and metadata from self.featureset."""
-        return {v.name: self.get_parameters_and_metadata(
+        return {k: self.get_parameters_and_metadata(
             v) for k, v in self.featureset.items() if v.hidden == hidden}
 
     def _pop_hidden(self, results):
-        """Returns resluts without hidden feature results."""
-        for fid, feature in self.featureset.items():
-            if feature.hidden:
-                results.pop(feature.name)
+        """Returns resluts without hidden and skipped feature results."""
+        for key, feature in self.featureset.items():
+            if feature.hidden or results[key] is SKIPPED:
+                results.pop(key)
         return results
+
+
+def _restart_segments(datas, featureset, sink, batch=False):
+    """Yields ``datas`` of a segmented source and restarts the features
+    before each new segment.
+
+    The sink (if given) receives each new segment before its results.
+
+    """
+    segment = None
+    for i, data in enumerate(datas):
+        current = data[2][0] if batch else data[2]
+        if i == 0 or current != segment:
+            if i > 0:
+                for feature in featureset.values():
+                    feature.restart()
+            if sink is not None:
+                sink.receive_segment(current)
+            segment = current
+        yield data
+
+
+def _split_batch(results, count):
+    """Yields a Result per block from the results of a batch."""
+    for i in range(count):
+        yield Result((name, values[i]) for name, values in results.items())
@@ -18,6 +18,7 @@ from .temporal import RootMeanSquare
 from .temporal import CrestFactor
 from .temporal import ZeroCrossingRate
 from .temporal import Peak
+from .temporal import Silence
 
 __all__ = [
     'Index',
@@ -35,5 +36,6 @@ __all__ = [
     'CrestFactor',
     'ZeroCrossingRate',
     'Peak',
+    'Silence',
     'Delta',
 ]
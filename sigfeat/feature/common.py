@@ -7,11 +7,26 @@ from ..base import HiddenFeature
 from ..base import Parameter
 
 
+def batch_axis(axis):
+    """Returns the given block axis shifted behind the leading frame axis."""
+    if axis < 0:
+        return axis
+    return axis + 1
+
+
+def reduced_axes(values):
+    """Returns all axes of batch values except the leading frame axis."""
+    return tuple(range(1, np.ndim(values)))
+
+
 class Index(Feature):
     """Index of source."""
     def process(self, data, result):
         return data[1]
 
+    def process_batch(self, data, results):
+        return data[1]
+
 
 class WindowedSignal(HiddenFeature):
     """WindowedSignal Feature provides a windowed block from source.
@@ -26,6 +41,8 @@ class WindowedSignal(HiddenFeature):
     periodic : bool
         Periodic True (e.g. for ffts) or symmetric False.
 
+    Single precision blocks are windowed in single precision.
+
     """
     window = Parameter(default='hann')
     size = Parameter()
@@ -43,12 +60,18 @@ class WindowedSignal(HiddenFeature):
         if self.channels > 1:
             win = np.tile(win, (self.channels, 1)).T
         self.w = win
+        self.w32 = win.astype(np.float32)
 
     def process(self, data, result):
         if self.window == 'rect':
             return data[0]
+        if data[0].dtype == np.float32:
+            return self.w32 * data[0]
         return self.w * data[0]
 
+    def process_batch(self, data, results):
+        return self.process(data, results)
+
 
 def centroid(index, values, axis):
     return np.sum(index * values, axis=axis) / np.sum(values, axis=axis)
@@ -60,7 +83,7 @@ def flatness(values, axis):
 
 def flux(values1, values2, axis):
     def _abs_max_ratio(s):
-        return s / np.max(s, axis=axis)
+        return s / np.max(s, axis=axis, keepdims=True)
     d = _abs_max_ratio(values2) - _abs_max_ratio(values1)
     return 0.5 * np.sum(d + np.abs(d), axis=axis)
 
@@ -72,25 +95,32 @@ def rolloff(absvalues, samplerate, kappa=0.85):
     return frequency
 
 
-def crest_factor(signal):
-    return np.max(np.abs(signal)) / np.sqrt(np.mean(signal*signal))
+def crest_factor(signal, axis=None):
+    return np.max(np.abs(signal), axis=axis) / np.sqrt(
+        np.mean(signal*signal, axis=axis))
 
 
-def zero_crossing_count(signal):
-    return np.round(0.5 * np.sum(np.abs(np.diff(np.sign(signal)))))
+def zero_crossing_count(signal, axis=None):
+    return np.round(
+        0.5 * np.sum(np.abs(np.diff(np.sign(signal))), axis=axis))
 
 
-def moments(signal):
-    mu = np.mean(signal)
-    sigma = signal - mu
-    framecount = len(signal)
+def moments(signal, axis=None):
+    signal = np.asarray(signal)
+    mu = np.mean(signal, axis=axis)
+    if axis is None:
+        sigma = signal - mu
+        framecount = len(signal)
+    else:
+        sigma = signal - np.expand_dims(mu, axis)
+        framecount = signal.shape[np.min(axis)]
 
     # moments:
     ss = sigma*sigma
-    mu_variance = np.mean(ss)
+    mu_variance = np.mean(ss, axis=axis)
     sss = ss * sigma
-    mu_skewness = np.mean(sss)
-    mu_kurtosis = np.mean(sss * sigma)
+    mu_skewness = np.mean(sss, axis=axis)
+    mu_kurtosis = np.mean(sss * sigma, axis=axis)
 
     # standardize the moments:
     mu_kurtosis = mu_kurtosis / (mu_variance * mu_variance)
@@ -1,27 +1,236 @@
-from collections import deque
+from math import factorial
 
 import numpy as np
 
 from ..base import Feature
 from ..base import Parameter
+from ..base.result import SKIPPED
+
+
+def difference_weights(order):
+    """Returns the weights of the finite difference of order, oldest
+    value first."""
+    k = np.arange(order + 1)
+    binomials = np.array(
+        [factorial(order) // (factorial(i) * factorial(order - i))
+         for i in k])
+    return (-1.0)**(order - k) * binomials
+
+
+def regression_weights(width):
+    """Returns the weights of the slope of the regression line over
+    ``2*width+1`` values, oldest value first."""
+    n = np.arange(-width, width + 1)
+    return n / np.sum(n*n)
+
+
+class DeltaIndex(Feature):
+    """Index of the blocks a lagging Delta is centered at.
+
+    Is required as visible ``<name>_index`` by a regression Delta
+    (width > 0) or a Delta of one. Like the Delta, it requires the
+    feature the Delta is taken of and is ``SKIPPED`` for the first
+    ``width`` results of the feature after the start, a restart
+    or skipped blocks.
+
+    Parameters
+    ----------
+    width : int
+        Number of blocks the Delta is centered before the result of
+        the feature.
+
+    """
+    width = Parameter(0)
+    _compact = True
+
+    def on_start(self, source, featureset, sink):
+        feature = self._requirements[0]
+        self._name = feature.name
+        lag = self.width + getattr(feature, 'lag', 0)
+        self._offset = lag * (source.blocksize - source.overlap)
+        self._count = 0
+
+    def restart(self):
+        self._count = 0
+
+    def skip(self, data, result):
+        self._count = 0
+        return data[1]
+
+    def process(self, data, result):
+        if result[self._name] is SKIPPED:
+            return SKIPPED
+        if self._count < self.width:
+            self._count += 1
+            return SKIPPED
+        return data[1] - self._offset
+
+    def process_batch(self, data, results):
+        values = results[self._name]
+        skipped = _leading_skipped(values)
+        warming = min(self.width - self._count, len(values) - skipped)
+        self._count += warming
+        indices = np.asarray(data[1]) - self._offset
+        if skipped or warming:
+            skipped += warming
+            return [SKIPPED] * skipped + list(indices[skipped:])
+        return indices
+
+
+def _leading_skipped(values):
+    """Returns the number of ``SKIPPED`` values at the start."""
+    count = 0
+    for value in values:
+        if value is not SKIPPED:
+            break
+        count += 1
+    return count
 
 
 class Delta(Feature):
-    """Returns a diffenetiated version of the given feature."""
-    axis = Parameter(0)
+    """Returns a diffenetiated version of the given feature.
+
+    The preceding results of the feature are kept in a preallocated
+    circular buffer, each delta is one weighted sum over the buffer.
+
+    Parameters
+    ----------
+    feature : Feature instance
+    order : int
+        Order of the finite differences, default 1.
+    width : int
+        If width > 0, the delta is the regression over ``2*width+1``
+        results (the N-frame delta formula used for MFCC deltas):
+
+        .. math::
+
+            d_m = \\frac{\\sum_{n=1}^{N} n (c_{m-N+n} - c_{m-N-n})}{
+                  2 \\sum_{n=1}^{N} n^2}
+
+        It is the delta centered ``width`` blocks before the current
+        block, the result of the first ``width`` blocks is ``SKIPPED``
+        and the index of the centered block is added as visible
+        ``<name>_index`` (see :py:class:`DeltaIndex`). So each delta
+        is aligned with its own block by the index, the deltas of the
+        last ``width`` blocks (of the source, of each segment and
+        before skipped blocks) are not extracted. The order must
+        be 1 then.
+    padding : {'edge', 'nan'}
+        The deltas of the first blocks, as long as fewer preceding
+        results are available, are computed as if the first result
+        was repeated before ('edge') or are nan ('nan').
+
+    Notes
+    -----
+    A Delta of a regression Delta (e.g. the delta-deltas of MFCC) lags
+    behind by both widths and skips the ``SKIPPED`` results of it.
+
+    """
     order = Parameter(1)
+    width = Parameter(0)
+    padding = Parameter('edge')
 
     def __init__(self, feature, **parameters):
         self.unroll_parameters(parameters)
+        if self.width > 0 and self.order != 1:
+            raise ValueError('A regression Delta must be of order 1.')
+        if self.padding not in ('edge', 'nan'):
+            raise ValueError(
+                'Unknown padding {!r}.'.format(self.padding))
         self.feature = feature
         self.name = ''.join((self.order * 'd', feature.name))
-        self.values = deque([None]*(self.order+1), maxlen=self.order+1)
         self._requirements = []
+        if self.width > 0:
+            self.weights = regression_weights(self.width)
+        else:
+            self.weights = difference_weights(self.order)
+        # the weights for each head position of the circular buffer:
+        self._rolled = np.array([
+            np.roll(self.weights, head) for head in range(len(self.weights))])
+        self.buffer = None
+        self._head = 0
+        self._count = 0
 
     def requires(self):
         yield self.feature
+        if self.lag > 0:
+            index = DeltaIndex(
+                name=self.name + '_index',
+                requirements=[self.feature],
+                width=self.width)
+            if self._gate is not None:
+                index.gated(self._gate, self._fill)
+            yield index
+
+    @property
+    def lag(self):
+        """Returns the number of blocks the deltas are centered before
+        the current block."""
+        return self.width + getattr(self.feature, 'lag', 0)
+
+    @property
+    def compact(self):
+        return self.lag > 0
+
+    def new(self):
+        """Returns new initial Delta of a new feature instance."""
+        return self._inherit(self.__class__(
+            self.feature.new(), **dict(self.parameters)))
+
+    @property
+    def warmup(self):
+        """Returns the number of preceding blocks needed."""
+        return len(self.weights) - 1
+
+    def _start_buffer(self, value):
+        value = np.asarray(value, dtype=float)
+        self.buffer = np.empty((len(self.weights),) + value.shape)
+        self.buffer[...] = value if self.padding == 'edge' else np.nan
+        self._head = 0
+        self._count = 0
+
+    def restart(self):
+        """Restarts the deltas like at the start."""
+        self.buffer = None
+
+    def skip(self, data, resultd):
+        """Restarts the deltas after skipped blocks like at the start."""
+        self.restart()
+        return super(Delta, self).skip(data, resultd)
 
     def process(self, data, resultd):
-        self.values.append(resultd[self.feature.name])
-        if None not in self.values:
-            return np.diff(np.array(self.values), self.order, axis=self.axis)
+        value = resultd[self.feature.name]
+        if value is SKIPPED:
+            return SKIPPED
+        if self.buffer is None:
+            self._start_buffer(value)
+        self.buffer[self._head] = value
+        self._head = (self._head + 1) % len(self.buffer)
+        if self._count < self.width:
+            self._count += 1
+            return SKIPPED
+        # the oldest value is at the head of the buffer:
+        return np.tensordot(self._rolled[self._head], self.buffer, 1)
+
+    def process_batch(self, data, results):
+        values = results[self.feature.name]
+        skipped = _leading_skipped(values)
+        if skipped == len(values):
+            return [SKIPPED] * skipped
+        values = np.asarray(values[skipped:], dtype=float)
+        if self.buffer is None:
+            self._start_buffer(values[0])
+        numweights = len(self.weights)
+        history = np.roll(self.buffer, -self._head, axis=0)[1:]
+        values = np.concatenate((history, values))
+        framecount = len(values) - numweights + 1
+        deltas = self.weights[0] * values[:framecount]
+        for i in range(1, numweights):
+            deltas += self.weights[i] * values[i:i+framecount]
+        self.buffer = values[-numweights:].copy()
+        self._head = 0
+        warming = min(self.width - self._count, framecount)
+        self._count += warming
+        if skipped or warming:
+            return [SKIPPED] * (skipped + warming) + list(deltas[warming:])
+        return deltas
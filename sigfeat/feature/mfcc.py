@@ -1,6 +1,6 @@
 import warnings
 import numpy as np
-from scipy.fftpack import dct
+from scipy.sparse import csr_matrix
 
 from pyfilterbank.melbank import compute_melmat
 
@@ -12,6 +12,20 @@ from .spectral import AbsRfft
 
 
 class MelSpectrum(HiddenFeature):
+    """Mel spectrum of AbsRfft (hidden per default).
+
+    The triangular filters cover only a few bins each, so the mel matrix
+    is applied as sparse matrix ``filters``. The dense mel matrix is kept
+    in ``melmat``.
+
+    Parameters
+    ----------
+    numbands : int
+    fmin : scalar
+    fmax : scalar
+        Default None is the highest frequency of AbsRfft.
+
+    """
     numbands = Parameter(128)
     fmin = Parameter(0)
     fmax = Parameter(None)
@@ -21,35 +35,104 @@ class MelSpectrum(HiddenFeature):
 
     def on_start(self, source, featureset, sink):
         warnings.warn('The mfcc results are not validated until now.')
-        fftmax = np.max(featureset['AbsRfft'].frequencies)
-        nfft = featureset['AbsRfft'].nfft
+        frequencies = featureset['AbsRfft'].frequencies
+        fftmax = np.max(frequencies)
         if not self.fmax or self.fmax > fftmax:
             self.fmax = fftmax
         self.melmat, (self.melfreqs, self.fftfreqs) = compute_melmat(
             self.numbands,
             self.fmin,
             self.fmax,
-            nfft,
+            len(frequencies),
             source.samplerate
         )  # TODO scaling by bandwidth not done until now
+        self.filters = csr_matrix(self.melmat)
 
     def process(self, data, resd):
-        return np.dot(self.melmat, resd['AbsRfft'])
+        return self.filters.dot(resd['AbsRfft'])
+
+    def process_batch(self, data, results):
+        # the bins of all frames (and channels) are filtered as columns:
+        bins = np.moveaxis(results['AbsRfft'], 1, 0)
+        melspecs = self.filters.dot(bins.reshape(len(bins), -1))
+        return np.moveaxis(melspecs.reshape((-1,) + bins.shape[1:]), 0, 1)
 
 
 class LogMelSpectrum(HiddenFeature):
+    """Mel spectrum in dB (hidden per default).
+
+    Parameters
+    ----------
+    floor : scalar
+        Mel spectrum values below floor are raised to floor, so silent
+        blocks give ``20*log10(floor)`` instead of -inf.
+
+    """
+    floor = Parameter(1e-10)
+
     def requires(self):
         yield MelSpectrum
 
+    def on_start(self, source, featureset, sink):
+        self.numbands = featureset['MelSpectrum'].numbands
+
     def process(self, data, resd):
-        return 20*np.log10(resd['MelSpectrum'])
+        logmelspec = np.maximum(resd['MelSpectrum'], self.floor)
+        np.log10(logmelspec, out=logmelspec)
+        logmelspec *= 20
+        return logmelspec
+
+    def process_batch(self, data, results):
+        return self.process(data, results)
+
+
+def dct_matrix(numbins, numbands):
+    """Returns matrix of the unnormalized DCT-II of ``numbins`` points.
+
+    Like ``scipy.fftpack.dct(x, type=2, n=numbins)`` the input of
+    length ``numbands`` is truncated or zero padded to ``numbins``.
+
+    """
+    k = np.arange(numbins)[:, np.newaxis]
+    n = np.arange(min(numbins, numbands))
+    dctmat = np.zeros((numbins, numbands))
+    dctmat[:, :len(n)] = 2*np.cos(np.pi*k*(2*n + 1) / (2*numbins))
+    return dctmat
 
 
 class MFCC(Feature):
+    """Mel frequency cepstral coefficients.
+
+    The DCT-II of the LogMelSpectrum along the bands is computed as
+    product with a matrix precomputed in ``on_start``, for batches in
+    one product for all frames.
+
+    Parameters
+    ----------
+    numbins : int
+        Number of coefficients.
+    lifter : scalar
+        Coefficient n is weighted by ``1 + lifter/2*sin(pi*n/lifter)``
+        if lifter > 0. Default 0 is no liftering.
+
+    """
     numbins = Parameter(20)
+    lifter = Parameter(0)
 
     def requires(self):
         yield LogMelSpectrum
 
+    def on_start(self, source, featureset, sink):
+        self.dctmat = dct_matrix(
+            self.numbins, featureset['LogMelSpectrum'].numbands)
+        if self.lifter > 0:
+            n = np.arange(self.numbins)
+            self.dctmat *= (1 + 0.5*self.lifter*np.sin(
+                np.pi*n/self.lifter))[:, np.newaxis]
+
     def process(self, data, resd):
-        return dct(resd['LogMelSpectrum'], type=2, n=self.numbins)
+        return np.dot(self.dctmat, resd['LogMelSpectrum'])
+
+    def process_batch(self, data, results):
+        mfccs = np.tensordot(self.dctmat, results['LogMelSpectrum'], (1, 1))
+        return np.moveaxis(mfccs, 0, 1)
@@ -1,20 +1,33 @@
 import numpy as np
-from scipy.fftpack import rfft, rfftfreq
+
+try:
+    from scipy.fft import rfft, rfftfreq
+except ImportError:  # pragma: no coverage
+    from numpy.fft import rfft as _rfft, rfftfreq
+
+    def rfft(x, n=None, axis=-1, workers=None):
+        return _rfft(x, n=n, axis=axis)
 
 from ..base import Feature
 from ..base import HiddenFeature
 from ..base import Parameter
 
 from .common import WindowedSignal
+from .common import batch_axis
+from .common import reduced_axes
 from .common import crest_factor
 from .common import flatness
 from .common import flux
-from .common import rolloff
 
 
 class Rfft(HiddenFeature):
     """Rfft Spectrum feature (hidden per default)
 
+    The complex half spectrum with ``nfft//2+1`` bins is computed with
+    :py:func:`scipy.fft.rfft` (or :py:func:`numpy.fft.rfft` for older
+    scipy versions). Single precision blocks give single precision
+    spectra.
+
     Parameters
     ----------
     nfft : int
@@ -22,12 +35,27 @@ class Rfft(HiddenFeature):
     window : bool
         Whether to use a window or not. If you need a special window,
         create a WindowedSignal instance.
+    workers : int
+        Number of threads used for the ffts of a batch of blocks,
+        see :py:func:`scipy.fft.rfft`. None uses one thread. It is no
+        Parameter, so it does not change the identity of the feature.
 
     """
     nfft = Parameter()
     axis = Parameter(default=0)
     window = Parameter(default=True)
 
+    def __init__(self, workers=None, **parameters):
+        self.workers = workers
+        super(Rfft, self).__init__(**parameters)
+
+    def new(self):
+        """Returns new initial feature instance with same parameters
+        and workers."""
+        feature = super(Rfft, self).new()
+        feature.workers = self.workers
+        return feature
+
     def requires(self):
         if self.window:
             yield WindowedSignal(size=self.nfft)
@@ -50,7 +78,19 @@ class Rfft(HiddenFeature):
         return rfft(
             s,
             n=self.nfft,
-            axis=self.axis)
+            axis=self.axis,
+            workers=self.workers)
+
+    def process_batch(self, data, results):
+        if self.window:
+            s = results['WindowedSignal']
+        else:
+            s = data[0]
+        return rfft(
+            s,
+            n=self.nfft,
+            axis=batch_axis(self.axis),
+            workers=self.workers)
 
 
 class AbsRfft(Rfft):
@@ -64,18 +104,24 @@ class AbsRfft(Rfft):
     window : bool
         Whether to use a window or not. If you need a special window,
         create a WindowedSignal instance.
+    workers : int
+        Number of threads used for the ffts of a batch of blocks.
 
     """
     def requires(self):
         return [Rfft(
             nfft=self.nfft,
             axis=self.axis,
-            window=self.window
+            window=self.window,
+            workers=self.workers
         )]
 
     def process(self, data, featuredata):
         return np.abs(featuredata['Rfft'])
 
+    def process_batch(self, data, results):
+        return np.abs(results['Rfft'])
+
 
 class SumAbsRfft(Rfft):
     axis = Parameter(0)
@@ -86,6 +132,61 @@ class SumAbsRfft(Rfft):
     def process(self, data, resd):
         return np.sum(resd['AbsRfft'], axis=self.axis)
 
+    def process_batch(self, data, results):
+        return np.sum(results['AbsRfft'], axis=batch_axis(self.axis))
+
+
+class SpectralMoments(HiddenFeature):
+    """Centroid, spread, skewness and kurtosis of AbsRfft (hidden per
+    default).
+
+    The centroid is computed first by a matrix product of AbsRfft with
+    the precomputed frequencies, the central moments are the sums over
+    the powers of the deviations :math:`f[k] - SC_m` then. Central sums
+    do not cancel like central moments expanded from raw moments.
+
+    The result holds centroid, spread, skewness and kurtosis along the
+    first axis (the second axis for batches).
+
+    Parameters
+    ----------
+    axis : int
+        Axis along the moments will be calculated, default=0.
+
+    """
+    axis = Parameter(0)
+
+    def requires(self):
+        yield AbsRfft
+
+    def on_start(self, source, featureset, sink):
+        self.frequencies = featureset['AbsRfft'].frequencies
+        self.powers = self.frequencies[:, np.newaxis] ** np.arange(2)
+
+    def moments(self, spectrum, axis):
+        """Returns centroid, spread, skewness and kurtosis of spectrum
+        along its last axis stacked along axis."""
+        total, centroid = np.moveaxis(
+            np.dot(spectrum, self.powers), -1, 0)
+        centroid /= total
+        deviations = self.frequencies - centroid[..., np.newaxis]
+        weighted = spectrum / total[..., np.newaxis]
+        weighted *= deviations
+        weighted *= deviations
+        spread = np.sum(weighted, axis=-1)
+        weighted *= deviations
+        skewness = np.sum(weighted, axis=-1) / np.sqrt(spread)**3
+        weighted *= deviations
+        kurtosis = np.sum(weighted, axis=-1) / spread**2
+        return np.stack((centroid, spread, skewness, kurtosis), axis=axis)
+
+    def process(self, data, resd):
+        return self.moments(np.moveaxis(resd['AbsRfft'], self.axis, -1), 0)
+
+    def process_batch(self, data, results):
+        return self.moments(
+            np.moveaxis(results['AbsRfft'], batch_axis(self.axis), -1), 1)
+
 
 class SpectralCentroid(Feature):
     """Centroid of AbsRfft.
@@ -102,34 +203,19 @@ class SpectralCentroid(Feature):
 
     """
     axis = Parameter(0)
+    _moment = 0
 
     def requires(self):
-        yield AbsRfft
-        yield SumAbsRfft
-
-    def on_start(self, source, featureset, sink):
-        self.channels = source.channels
-        self.frequencies = featureset['Rfft'].frequencies
-        if self.channels > 1:
-            self.frequencies = np.tile(
-                self.frequencies,
-                (self.channels, 1)).T
-
-    @staticmethod
-    def centroid(freqs, absrfft, sumabsrfft, axis):
-        return np.sum(freqs * absrfft, axis=axis) / sumabsrfft
+        yield SpectralMoments(axis=self.axis)
 
     def process(self, data, resd):
-        result = self.centroid(
-            self.frequencies,
-            resd['AbsRfft'],
-            resd['SumAbsRfft'],
-            self.axis)
-        return result
+        return resd['SpectralMoments'][self._moment]
+
+    def process_batch(self, data, results):
+        return results['SpectralMoments'][:, self._moment]
 
 
 class SpectralSpread(SpectralCentroid):
-    # TODO: Test
     """Spread of AbsRfft.
 
     .. math::
@@ -139,30 +225,13 @@ class SpectralSpread(SpectralCentroid):
     Parameters
     ----------
     axis : int
-        Axis along the centroid will be calculated, default=0.
+        Axis along the spread will be calculated, default=0.
 
     """
-    axis = Parameter(0)
-
-    def requires(self):
-        yield SpectralCentroid()
-
-    @staticmethod
-    def spread(freqs, absrfft, sumabsrfft, centroid, axis):
-        return np.sum((freqs-centroid)**2 * absrfft, axis=axis) / sumabsrfft
-
-    def process(self, data, resd):
-        result = self.spread(
-            self.frequencies,
-            resd['AbsRfft'],
-            resd['SumAbsRfft'],
-            resd['SpectralCentroid'],
-            self.axis)
-        return result
+    _moment = 1
 
 
 class SpectralSkewness(SpectralCentroid):
-    # TODO: Test
     """Skewness of AbsRfft.
 
     .. math::
@@ -172,33 +241,13 @@ class SpectralSkewness(SpectralCentroid):
     Parameters
     ----------
     axis : int
-        Axis along the centroid will be calculated, default=0.
+        Axis along the skewness will be calculated, default=0.
 
     """
-    axis = Parameter(0)
-
-    def requires(self):
-        yield SpectralCentroid()
-        yield SpectralSpread()
-
-    @staticmethod
-    def skewness(freqs, absrfft, sumabsrfft, centroid, spread, axis):
-        m3 = np.sum((freqs-centroid)**3 * absrfft, axis=axis) / sumabsrfft
-        return m3 / np.sqrt(spread)**3
-
-    def process(self, data, resd):
-        result = self.skewness(
-            self.frequencies,
-            resd['AbsRfft'],
-            resd['SumAbsRfft'],
-            resd['SpectralCentroid'],
-            resd['SpectralSpread'],
-            self.axis)
-        return result
+    _moment = 2
 
 
 class SpectralKurtosis(SpectralCentroid):
-    # TODO: Test
     """Kurtosis of AbsRfft.
 
     .. math::
@@ -208,29 +257,10 @@ class SpectralKurtosis(SpectralCentroid):
     Parameters
     ----------
     axis : int
-        Axis along the centroid will be calculated, default=0.
+        Axis along the kurtosis will be calculated, default=0.
 
     """
-    axis = Parameter(0)
-
-    def requires(self):
-        yield SpectralCentroid()
-        yield SpectralSpread()
-
-    @staticmethod
-    def kurtosis(freqs, absrfft, sumabsrfft, centroid, spread, axis):
-        m4 = np.sum((freqs-centroid)**4 * absrfft, axis=axis) / sumabsrfft
-        return m4 / spread**2
-
-    def process(self, data, resd):
-        result = self.kurtosis(
-            self.frequencies,
-            resd['AbsRfft'],
-            resd['SumAbsRfft'],
-            resd['SpectralCentroid'],
-            resd['SpectralSpread'],
-            self.axis)
-        return result
+    _moment = 3
 
 
 class SpectralFlatness(Feature):
@@ -255,6 +285,9 @@ class SpectralFlatness(Feature):
     def process(self, data, featuredata):
         return flatness(featuredata['AbsRfft'], self.axis)
 
+    def process_batch(self, data, results):
+        return flatness(results['AbsRfft'], batch_axis(self.axis))
+
 
 class SpectralFlux(Feature):
     """Flux of AbsRfft.
@@ -274,16 +307,26 @@ class SpectralFlux(Feature):
 
     """
     axis = Parameter(0)
+    _warmup = 1
 
     def requires(self):
         yield AbsRfft
 
     def on_start(self, source, featureset, sink):
-        nfft = featureset['AbsRfft'].nfft
+        numbins = len(featureset['AbsRfft'].frequencies)
         if source.channels > 1:
-            self._lastspec = np.ones((nfft, source.channels))
+            self._lastspec = np.ones((numbins, source.channels))
         else:
-            self._lastspec = np.ones(nfft)
+            self._lastspec = np.ones(numbins)
+
+    def restart(self):
+        """Restarts the flux like at the start."""
+        self._lastspec = np.ones_like(self._lastspec)
+
+    def skip(self, data, featuredata):
+        """Restarts the flux after skipped blocks like at the start."""
+        self.restart()
+        return super(SpectralFlux, self).skip(data, featuredata)
 
     def process(self, data, featuredata):
         curspec = featuredata['AbsRfft']
@@ -291,6 +334,13 @@ class SpectralFlux(Feature):
         self._lastspec = curspec
         return specflux
 
+    def process_batch(self, data, results):
+        curspecs = results['AbsRfft']
+        lastspecs = np.concatenate(
+            (self._lastspec[np.newaxis], curspecs[:-1]))
+        self._lastspec = curspecs[-1]
+        return flux(lastspecs, curspecs, batch_axis(self.axis))
+
 
 class SpectralCrestFactor(Feature):
     """Crest Factor of AbsRfft
@@ -306,6 +356,10 @@ class SpectralCrestFactor(Feature):
     def process(self, data, result):
         return crest_factor(result['AbsRfft'])  # TODO decompose
 
+    def process_batch(self, data, results):
+        absrffts = results['AbsRfft']
+        return crest_factor(absrffts, axis=reduced_axes(absrffts))
+
 
 class SpectralRolloff(Feature):
     """Rolloff from AbsRfft.
@@ -327,23 +381,60 @@ class SpectralRolloff(Feature):
         yield AbsRfft
 
     def on_start(self, source, featureset, sink):
-        self.samplerate = source.samplerate
+        self.frequencies = featureset['AbsRfft'].frequencies
 
     def process(self, data, result):
-        return rolloff(result['AbsRfft'], self.samplerate, self.kappa)
+        absrfft = result['AbsRfft']
+        cumspec = np.cumsum(absrfft)
+        rolloffindex = np.argmax(cumspec > self.kappa*cumspec[-1])
+        # the channels of a bin are adjacent in the flattened spectrum:
+        return self.frequencies[rolloffindex * len(absrfft) // absrfft.size]
+
+    def process_batch(self, data, results):
+        absrffts = results['AbsRfft']
+        cumspecs = np.cumsum(absrffts.reshape(len(absrffts), -1), axis=1)
+        rolloffindex = np.argmax(
+            cumspecs > self.kappa*cumspecs[:, -1:], axis=1)
+        return self.frequencies[
+            rolloffindex * absrffts.shape[1] // cumspecs.shape[1]]
 
 
 class SpectralSlope(Feature):
-    # TODO: Test, doc, formula
-    
+    """Slope of AbsRfft.
+
+    The slope of the least squares fit :math:`w f[k]` of the spectrum
+    without its mean:
+
+    .. math::
+
+        SSL_m = \\frac{\\sum_k f[k] (|X_m[k]| - \\overline{|X_m|})}{
+                \\sum_k f[k]^2}
+
+    The projection vector is precomputed, so it is one dot product per
+    block.
+
+    Parameters
+    ----------
+    axis : int
+        Axis along the slope will be calculated, default=0.
+
+    """
+    axis = Parameter(0)
+
     def requires(self):
         yield AbsRfft
 
-    def on_start(self, source, features, sink):
-        self.frequencies = np.array([features['AbsRfft'].frequencies]).T
+    def on_start(self, source, featureset, sink):
+        frequencies = featureset['AbsRfft'].frequencies
+        projection = frequencies / np.dot(frequencies, frequencies)
+        # subtracting the mean of the projection removes the spectrum mean:
+        self.projection = projection - np.mean(projection)
 
     def process(self, data, resd):
-        absrfft = np.array(resd['AbsRfft'])
-        absrfft -= np.mean(absrfft)
-        w = np.linalg.lstsq(self.frequencies, absrfft)[0]
-        return w[0]
+        return np.dot(np.moveaxis(resd['AbsRfft'], self.axis, -1),
+                      self.projection)
+
+    def process_batch(self, data, results):
+        return np.dot(
+            np.moveaxis(results['AbsRfft'], batch_axis(self.axis), -1),
+            self.projection)
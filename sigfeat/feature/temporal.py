@@ -1,14 +1,129 @@
 import numpy as np
-from scipy.stats import skew, kurtosis
 
 from ..base import Feature
 from ..base import HiddenFeature
 from ..base import Parameter
 
+from .common import batch_axis
 from .common import centroid
 from .common import flatness
-from .common import moments
-from .common import zero_crossing_count
+from .common import reduced_axes
+
+
+class TemporalStats(HiddenFeature):
+    """Extrema, mean and mean square of Source data computed together
+    (hidden per default).
+
+    The result holds the statistics named in ``labels`` along the first
+    axis (the second axis for batches): minimum, maximum, peak, mean and
+    mean square. Each is one reduction of the signal without temporary
+    arrays of the abs or squared signal.
+
+    Parameters
+    ----------
+    axis : int
+        Axis along which the statistics are computed.
+
+    """
+    axis = Parameter(0)
+    labels = ['min', 'max', 'peak', 'mean', 'meansquare']
+
+    @staticmethod
+    def stats(signal, axis):
+        """Returns list of the statistics of signal along axis."""
+        x = np.moveaxis(np.asarray(signal), axis, -1)
+        n = x.shape[-1]
+        minimum = np.minimum.reduce(x, axis=-1)
+        maximum = np.maximum.reduce(x, axis=-1)
+        mean = np.add.reduce(x, axis=-1) / n
+        meansquare = np.einsum('...i,...i->...', x, x) / n
+        return [minimum, maximum, np.maximum(-minimum, maximum), mean,
+                meansquare]
+
+    def process(self, data, result):
+        return np.stack(self.stats(data[0], self.axis))
+
+    def process_batch(self, data, results):
+        return np.stack(
+            self.stats(data[0], batch_axis(self.axis)), axis=1)
+
+
+class TemporalMoments(HiddenFeature):
+    """Central moments of Source data computed together (hidden per
+    default).
+
+    The result holds variance, third and fourth central moment along
+    the first axis (the second axis for batches). They are summed over
+    the products of one temporary array of the deviations from the mean
+    of TemporalStats.
+
+    Parameters
+    ----------
+    axis : int
+        Axis along which the moments are computed.
+
+    """
+    axis = Parameter(0)
+    labels = ['variance', 'moment3', 'moment4']
+
+    def requires(self):
+        yield TemporalStats(axis=self.axis)
+
+    @staticmethod
+    def moments(signal, mean, axis):
+        """Returns list of the central moments of signal along axis."""
+        x = np.moveaxis(np.asarray(signal), axis, -1)
+        n = x.shape[-1]
+        d = x - mean[..., np.newaxis]
+        return [np.einsum('...i,...i->...', d, d) / n,
+                np.einsum('...i,...i,...i->...', d, d, d) / n,
+                np.einsum('...i,...i,...i,...i->...', d, d, d, d) / n]
+
+    def process(self, data, result):
+        return np.stack(self.moments(
+            data[0], result['TemporalStats'][3], self.axis))
+
+    def process_batch(self, data, results):
+        return np.stack(self.moments(
+            data[0],
+            results['TemporalStats'][:, 3],
+            batch_axis(self.axis)), axis=1)
+
+
+class TemporalStat(Feature):
+    """Base class of the features taking statistics from TemporalStats
+    (or from the ``_stats`` feature class).
+
+    Parameters
+    ----------
+    axis : int
+        Axis along which the feature is computed.
+
+    """
+    axis = Parameter(0)
+    _stats = TemporalStats
+    _stat = 0
+
+    def requires(self):
+        yield self._stats(axis=self.axis)
+
+    def process(self, data, resd):
+        return resd[self._stats.__name__][self._stat]
+
+    def process_batch(self, data, results):
+        return results[self._stats.__name__][:, self._stat]
+
+
+class TemporalMoment(TemporalStat):
+    """Base class of the features taking moments from TemporalMoments.
+
+    Parameters
+    ----------
+    axis : int
+        Axis along which the feature is computed.
+
+    """
+    _stats = TemporalMoments
 
 
 class CrestFactor(Feature):
@@ -33,6 +148,9 @@ class CrestFactor(Feature):
     def process(self, data, resd):
         return resd['Peak'] / resd['RootMeanSquare']
 
+    def process_batch(self, data, results):
+        return self.process(data, results)
+
 
 class ZeroCrossingRate(Feature):
     """Zero Crossings Rate of Source data.
@@ -41,22 +159,73 @@ class ZeroCrossingRate(Feature):
         ZCR_m = \\frac{f_s}{N} \\lfloor 0.5 + \\frac{1}{2}
                 \\sum_n |\\mathrm{sgn}(x_m[n+1])-\\mathrm{sgn}(x_m[n])| \\rfloor
 
+    The sign changes are counted on boolean masks of the positive and
+    negative samples instead of float sign arrays.
+
+    Parameters
+    ----------
+    axis : int
+        Axis along which the feature is computed.
+
     """
-    # TODO axis parameter
+    axis = Parameter(0)
+
+    @staticmethod
+    def crossings(signal, axis):
+        """Returns the number of zero crossings of signal along axis."""
+        x = np.moveaxis(np.asarray(signal), axis, -1)
+        changes = 0
+        for mask in (x > 0, x < 0):
+            changes = changes + np.count_nonzero(
+                mask[..., 1:] != mask[..., :-1], axis=-1)
+        return np.round(0.5 * changes)
 
     def on_start(self, source, featureset, sink):
         self.factor = source.samplerate / source.blocksize
 
-    def process(self, data, result):
-        return zero_crossing_count(data[0]) * self.factor
+    def process(self, data, resd):
+        return self.crossings(data[0], self.axis) * self.factor
+
+    def process_batch(self, data, results):
+        return self.crossings(data[0], batch_axis(self.axis)) * self.factor
 
 
-class StatMoments(Feature):
-    """Estimates mu, variance, skewness and kurtosis of Source data."""
+class StatMoments(TemporalMoment):
+    """Estimates mu, variance, skewness and kurtosis of Source data.
+
+    Parameters
+    ----------
+    axis : int
+        Axis along which the feature is computed.
+
+    """
     labels = ['mu', 'mu_variance', 'mu_skewness', 'mu_kurtosis']
 
-    def process(sefl, data, result):
-        return moments(data[0])
+    def requires(self):
+        yield TemporalStats(axis=self.axis)
+        yield TemporalMoments(axis=self.axis)
+
+    def process(self, data, resd):
+        return self.moments(
+            resd['TemporalStats'][3],
+            resd['TemporalMoments'],
+            np.shape(data[0])[self.axis])
+
+    def process_batch(self, data, results):
+        return list(zip(*self.moments(
+            results['TemporalStats'][:, 3],
+            np.moveaxis(results['TemporalMoments'], 1, 0),
+            np.shape(data[0])[batch_axis(self.axis)])))
+
+    @staticmethod
+    def moments(mu, moments, n):
+        """Returns the moments from mean and TemporalMoments along the
+        first axis of n samples."""
+        variance, moment3, moment4 = moments[0], moments[1], moments[2]
+        return (mu,
+                variance * n / (n - 1),
+                moment3 / np.sqrt(variance)**3,
+                moment4 / (variance * variance))
 
 
 class SquaredSignal(HiddenFeature):
@@ -71,6 +240,9 @@ class SquaredSignal(HiddenFeature):
         sig = data[0]
         return sig*sig
 
+    def process_batch(self, data, results):
+        return self.process(data, results)
+
 
 class AbsSignal(HiddenFeature):
     """Abs from source data (as hidden feature).
@@ -82,6 +254,9 @@ class AbsSignal(HiddenFeature):
     def process(self, data, result):
         return np.abs(data[0])
 
+    def process_batch(self, data, results):
+        return self.process(data, results)
+
 
 class CentroidAbsSignal(Feature):
     """Experimental Centroid of abs source data.
@@ -108,6 +283,12 @@ class CentroidAbsSignal(Feature):
     def process(self, data, result):
         return centroid(self.index, result['AbsSignal'], axis=self.axis)
 
+    def process_batch(self, data, results):
+        return centroid(
+            self.index,
+            results['AbsSignal'],
+            axis=batch_axis(self.axis))
+
 
 class FlatnessAbsSignal(Feature):
     """Experimental Flatness of abs source data.
@@ -131,9 +312,12 @@ class FlatnessAbsSignal(Feature):
     def process(self, data, result):
         return flatness(result['AbsSignal'], axis=self.axis)
 
+    def process_batch(self, data, results):
+        return flatness(results['AbsSignal'], axis=batch_axis(self.axis))
+
 
-class MeanSquare(HiddenFeature):
-    """MeanSquare (MS) of squared Source data.
+class MeanSquare(TemporalStat):
+    """MeanSquare (MS) of Source data (hidden per default).
 
     .. math::
         MS_m = \\frac{1}{N}\\sum_n x_m[n]^2
@@ -144,13 +328,8 @@ class MeanSquare(HiddenFeature):
         Axis along which the feature is computed.
 
     """
-    axis = Parameter(0)
-
-    def requires(self):
-        return [SquaredSignal()]
-
-    def process(self, data, result):
-        return np.mean(result['SquaredSignal'], axis=self.axis)
+    _hidden = True
+    _stat = 4
 
 
 class RootMeanSquare(Feature):
@@ -173,59 +352,99 @@ class RootMeanSquare(Feature):
     def process(self, data, result):
         return np.sqrt(result['MeanSquare'])
 
+    def process_batch(self, data, results):
+        return self.process(data, results)
 
-class Peak(Feature):
-    """Peak of AbsSignal from Source data.
 
-    .. math::
-        P_m = \\max(|x_m|)
+class Silence(HiddenFeature):
+    """Gate marking blocks with a root mean square not above threshold.
+
+    The result is True for silent blocks, use it as gate to skip
+    expensive features on silent blocks, see
+    :py:meth:`sigfeat.base.Feature.gated`.
 
     Parameters
     ----------
+    threshold : scalar
+        Root mean square threshold, 0 marks only all zero blocks.
     axis : int
-        Axis along which the feature is computed.
 
     """
+    threshold = Parameter(0)
     axis = Parameter(0)
 
     def requires(self):
-        yield AbsSignal()
+        yield MeanSquare(axis=self.axis)
 
     def process(self, data, result):
-        return np.max(result['AbsSignal'], axis=self.axis)
+        return bool(np.all(result['MeanSquare'] <= self.threshold**2))
+
+    def process_batch(self, data, results):
+        meansquares = np.asarray(results['MeanSquare'])
+        return np.all(
+            meansquares <= self.threshold**2, axis=reduced_axes(meansquares))
+
+
+class Peak(TemporalStat):
+    """Peak of Source data.
+
+    .. math::
+        P_m = \\max(|x_m|)
+
+    Parameters
+    ----------
+    axis : int
+        Axis along which the feature is computed.
+
+    """
+    _stat = 2
 
 
-class Kurtosis(Feature):
+class Kurtosis(TemporalMoment):
     """Kurtosis of Source data.
 
+    .. math::
+        K_m = \\frac{\\frac{1}{N}\\sum_n (x_m[n] - \\mu_m)^4}{
+              \\sigma_m^4} - 3
+
     Parameters
     ----------
     axis : int
         Axis along which the feature is computed.
 
     """
-    axis = Parameter(0)
+    def process(self, data, resd):
+        moments = resd['TemporalMoments']
+        return moments[2] / (moments[0] * moments[0]) - 3
 
-    def process(self, data, result):
-        return kurtosis(data[0], axis=self.axis)
+    def process_batch(self, data, results):
+        moments = results['TemporalMoments']
+        return moments[:, 2] / (moments[:, 0] * moments[:, 0]) - 3
 
 
-class Skewness(Feature):
+class Skewness(TemporalMoment):
     """Skewness of Source data.
 
+    .. math::
+        S_m = \\frac{\\frac{1}{N}\\sum_n (x_m[n] - \\mu_m)^3}{
+              \\sigma_m^3}
+
     Parameters
     ----------
     axis : int
         Axis along which the feature is computed.
 
     """
-    axis = Parameter(0)
+    def process(self, data, resd):
+        moments = resd['TemporalMoments']
+        return moments[1] / np.sqrt(moments[0])**3
 
-    def process(self, data, result):
-        return skew(data[0], axis=self.axis)
+    def process_batch(self, data, results):
+        moments = results['TemporalMoments']
+        return moments[:, 1] / np.sqrt(moments[:, 0])**3
 
 
-class StandardDeviation(Feature):
+class StandardDeviation(TemporalMoment):
     """StandardDeviation (STD) of Source data.
 
     Just use the RootMeanSquare instad if you do not really need the std.
@@ -240,7 +459,8 @@ class StandardDeviation(Feature):
     RMS
 
     """
-    axis = Parameter(0)
+    def process(self, data, resd):
+        return np.sqrt(resd['TemporalMoments'][self._stat])
 
-    def process(self, data, result):
-        return np.std(data[0], axis=self.axis)
+    def process_batch(self, data, results):
+        return np.sqrt(results['TemporalMoments'][:, self._stat])
@@ -0,0 +1,149 @@
+"""This module implements the extraction of several resolutions in one pass.
+
+A :py:class:`FeatureGroup` holds features extracted with their own
+blocksize and overlap. The groups of an Extractor read the samples of
+the blocks of the source, so the source is decoded once for all
+resolutions. The samples are written once into one
+:py:class:`sigfeat.stream.RingBuffer` of the largest blocksize, the
+:py:class:`sigfeat.stream.Stream` of each group reads its blocks from it
+at its own position.
+
+The results of a group are received by the sink labeled with the group
+name, e.g. ``'long/MFCC'``. The indices of the blocks of all groups are
+sample indices of the source, add an ``Index`` feature to each group to
+align their results. A group gets the samples of the source blocks up
+to the length of the source (without the samples a last block is
+filled up with), so it yields no filled up last block beyond them.
+
+Example
+-------
+
+.. code:
+
+    extractor = Extractor(
+        SpectralCentroid(), Index(),
+        groups=[FeatureGroup('long', MFCC(), Index(), blocksize=8192,
+                             overlap=4096)])
+    sink = extractor.extract(SoundFileSource(path, blocksize=512), sink)
+
+"""
+
+from .base import Sink
+from .stream import RingBuffer
+
+
+class FeatureGroup(object):
+    """Features extracted with own blocksize and overlap.
+
+    Parameters
+    ----------
+    name : str
+        Label prefix of the results of the group.
+    *features : Feature instances
+    blocksize : int
+    overlap : int
+
+    """
+    def __init__(self, name, *features, blocksize=1024, overlap=0):
+        self.name = name
+        self.features = features
+        self.blocksize = blocksize
+        self.overlap = overlap
+
+
+class GroupSink(Sink):
+    """Sink passing the data and results of a group labeled to a sink.
+
+    Parameters
+    ----------
+    sink : Sink instance
+    name : str
+        The keys are prefixed with ``name + '/'``.
+
+    """
+    def __init__(self, sink, name):
+        self.sink = sink
+        self.prefix = name + '/'
+
+    def receive(self, datad):
+        self.sink.receive(
+            {self.prefix + key: value for key, value in datad.items()})
+
+    def receive_append(self, resultd):
+        self.sink.receive_append(
+            {self.prefix + key: value for key, value in resultd.items()})
+
+
+def _source_end(source, start):
+    """Returns the index after the last sample of the source generating
+    its first block at start, or None if the length is unknown."""
+    metadata = dict(source.metadata)
+    if 'arraylen' in metadata:
+        return start + metadata['arraylen']
+    if 'length' in metadata:
+        if source.frames < 1:
+            return metadata['length']
+        return min(start + source.frames, metadata['length'])
+    return None
+
+
+def feed_groups(datas, groups, extractors, source, sink, batch=False):
+    """Yields ``datas`` and feeds their samples to the groups.
+
+    The streams of the groups are opened at the first block and closed
+    after the last one. The samples are written once into a shared ring
+    buffer, in pieces not larger than the samples missing for the next
+    block of any stream, and each stream pulls its completed blocks.
+    Samples of overlapping blocks are written once.
+
+    Parameters
+    ----------
+    datas : iterable
+        ``(block, index)`` or in batch mode ``(blocks, indices)``.
+    groups : FeatureGroup instances
+    extractors : Extractor instances
+        One for the features of each group.
+    source : Source instance
+        Provides samplerate and channels.
+    sink : Sink instance
+    batch : bool
+
+    """
+    streams = None
+    position = None
+    end = None
+    for data in datas:
+        blocks = zip(data[0], data[1]) if batch else (data[:2],)
+        for block, index in blocks:
+            if streams is None:
+                ring = RingBuffer(
+                    max(group.blocksize for group in groups),
+                    source.channels)
+                streams = [
+                    extractor.open_stream(
+                        source.samplerate,
+                        source.channels,
+                        blocksize=group.blocksize,
+                        overlap=group.overlap,
+                        sink=GroupSink(sink, group.name),
+                        offset=index,
+                        ring=ring)
+                    for group, extractor in zip(groups, extractors)]
+                position = index
+                end = _source_end(source, index)
+            if end is not None and index + len(block) > end:
+                block = block[:max(0, end - index)]
+            samples = ring.frames(block[max(0, position - index):])
+            position = max(position, index + len(block))
+            start = 0
+            while start < len(samples):
+                stop = start + min(
+                    len(samples) - start,
+                    min(stream.missing for stream in streams))
+                ring.write(samples[start:stop])
+                start = stop
+                for stream in streams:
+                    stream.pull()
+        yield data
+    for stream in streams or ():
+        stream.close()
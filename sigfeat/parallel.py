@@ -0,0 +1,218 @@
+"""This module implements parallel extraction with worker processes.
+
+The extractor is sent once to every worker process, where a fresh
+copy of its features is used for each source.
+Sources can be :py:class:`Source` instances (must be picklable) or
+paths to sound files which are opened as
+:py:class:`sigfeat.source.soundfile.SoundFileSource` in the workers.
+
+With :py:func:`extract_chunked` one long source is split into chunks
+of blocks extracted in parallel. Each chunk starts ``Extractor.warmup``
+blocks earlier, so stateful features give the same results as in a
+sequential extraction.
+
+"""
+
+import os
+
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import as_completed
+from copy import deepcopy
+
+from .plan import ExtractionPlan
+from .sink.default import DefaultDictSink
+
+
+_worker_extractor = None
+
+
+def _init_worker(extractor):
+    """Stores the extractor in the worker process."""
+    global _worker_extractor
+    _worker_extractor = extractor
+
+
+def _default_sink_factory(source):
+    return DefaultDictSink()
+
+
+def _extract_source(source, sink_factory, batchsize, return_sinks, parameters):
+    """Extracts one source in the worker process."""
+    extractor = deepcopy(_worker_extractor)
+    sink = sink_factory(source)
+    if isinstance(source, str):
+        from .source.soundfile import SoundFileSource
+        source = SoundFileSource(source, **parameters)
+    extractor.extract(source, sink, batchsize=batchsize)
+    if return_sinks:
+        return sink
+    if hasattr(sink, 'close'):
+        sink.close()
+
+
+class _SegmentLog(object):
+    """Keeps the current segment of a segmented source."""
+    segment = None
+
+    def receive_segment(self, segment):
+        self.segment = segment
+
+
+def _extract_chunk(source, skip, batchsize):
+    """Extracts one chunk in the worker process and drops warmup results.
+
+    Returns the results, the segment of each result and the number of
+    blocks skipped by each gate (without the warmup blocks).
+
+    """
+    extractor = deepcopy(_worker_extractor)
+    results, segments = [], []
+    log = _SegmentLog()
+    extractor._start(source, None)
+    plan = ExtractionPlan(extractor.featureset, batch=bool(batchsize))
+    extracted = extractor._extract(source, batchsize, plan=plan, sink=log)
+    for i, result in enumerate(extracted):
+        if i >= skip:
+            plan.count_skipped(result)
+            results.append(dict(extractor._pop_hidden(result)))
+            segments.append(log.segment)
+    return results, segments, plan.skipped
+
+
+def source_length(source):
+    """Returns the length in samples of the given source or sound file path.
+
+    The length is taken from the ``length`` (e.g. SoundFileSource) or
+    ``arraylen`` (e.g. ArraySource) metadata. Returns 0 if unknown.
+
+    """
+    if isinstance(source, str):
+        from soundfile import info
+        return info(source).frames
+
+    def _length(metadata):
+        for key in ('length', 'arraylen'):
+            if key in metadata:
+                return metadata[key]
+        if 'parent' in metadata:
+            return _length(metadata['parent'])
+        return 0
+    return _length(dict(source.metadata))
+
+
+def extract_many(extractor,
+                 sources,
+                 sink_factory=None,
+                 workers=None,
+                 batchsize=None,
+                 return_sinks=True,
+                 **parameters):
+    """Extracts features of many sources in parallel worker processes.
+
+    The sources are scheduled longest first, so the workers are busy
+    until the end.
+
+    Parameters
+    ----------
+    extractor : Extractor instance
+    sources : iterable of Source instances or sound file paths
+    sink_factory : callable
+        Is called in the worker with the source (as given) and must return
+        a new Sink. Default returns a DefaultDictSink.
+    workers : int
+        Number of worker processes, default is the number of cpus.
+    batchsize : int
+        See :py:meth:`Extractor.extract`.
+    return_sinks : bool
+        Whether the sinks are sent back from the workers. If False,
+        sinks are closed (if possible) in the worker and None is returned
+        e.g. for sinks writing to files.
+    **parameters :
+        Parameters for the SoundFileSource created for sound file paths
+        e.g. blocksize and overlap.
+
+    Returns
+    -------
+    results : generator
+        Yields ``(source, sink)`` tuples in order of completion.
+
+    """
+    if sink_factory is None:
+        sink_factory = _default_sink_factory
+    sources = sorted(sources, key=source_length, reverse=True)
+    with ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_worker,
+            initargs=(extractor,)) as pool:
+        futures = {
+            pool.submit(
+                _extract_source,
+                source,
+                sink_factory,
+                batchsize,
+                return_sinks,
+                parameters): source for source in sources}
+        for future in as_completed(futures):
+            yield futures[future], future.result()
+
+
+def extract_chunked(extractor,
+                    source,
+                    chunks=None,
+                    workers=None,
+                    batchsize=None,
+                    segments=False,
+                    skipped=None):
+    """Extracts one source split into chunks in parallel worker processes.
+
+    The source must implement ``framecount()`` and ``chunk()``
+    e.g. ArraySource, SoundFileSource or SegmentSource of a file path.
+
+    Parameters
+    ----------
+    extractor : Extractor instance
+    source : Source instance
+    chunks : int
+        Number of chunks, default is the number of workers.
+    workers : int
+        Number of worker processes, default is the number of cpus.
+    batchsize : int
+        See :py:meth:`Extractor.extract`.
+    segments : bool
+        If True, ``(segment, result)`` tuples are yielded with the
+        segment of each result of a segmented source (None otherwise).
+    skipped : dict
+        If given, the number of blocks skipped by each gate is added up
+        in it by gate key.
+
+    Returns
+    -------
+    results : generator
+        Yields the result dicts (without hidden features) in block order.
+
+    """
+    framecount = source.framecount()
+    chunks = min(chunks or workers or os.cpu_count(), max(framecount, 1))
+    bounds = [framecount * i // chunks for i in range(chunks + 1)]
+    warmup = extractor.warmup
+    with ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_worker,
+            initargs=(extractor,)) as pool:
+        futures = []
+        for start, stop in zip(bounds[:-1], bounds[1:]):
+            begin = max(start - warmup, 0)
+            futures.append(pool.submit(
+                _extract_chunk,
+                source.chunk(begin, stop),
+                start - begin,
+                batchsize))
+        for future in futures:
+            results, chunksegments, chunkskipped = future.result()
+            if skipped is not None:
+                for key, count in chunkskipped.items():
+                    skipped[key] = skipped.get(key, 0) + count
+            if segments:
+                yield from zip(chunksegments, results)
+            else:
+                yield from results
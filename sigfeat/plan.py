@@ -0,0 +1,289 @@
+"""This module implements the extraction plan of a featureset.
+
+The plan is built once before extraction and flattens the featureset
+into a tuple of ``(key, process method)`` steps and the tuple
+of visible (not hidden) feature keys. So the per block loop neither
+iterates the featureset nor looks up feature attributes, and hidden
+results are skipped instead of popped from the results.
+
+The results are stored in a :py:class:`sigfeat.base.result.Result` dict
+by key, not in slots indexed by the position of the step: features read
+the results of their requirements by name, and a Result view mapping
+names to slots would cost one lookup more per read than the dict itself.
+
+Aliases of identical features copy the result instead of processing and
+features reading their requirements under other keys get a scoped view
+of the results, see :py:class:`sigfeat.base.feature.FeatureSet`.
+Gated features check the result of their gate and are skipped, see
+:py:meth:`sigfeat.base.Feature.gated`. The skipped blocks are counted
+per gate from the results of the blocks, so the counts of chunks
+extracted in parallel can be added up. Decimated features are only
+processed for the blocks kept by their
+:py:class:`sigfeat.base.feature.Decimation`, their result of other blocks
+is ``SKIPPED`` and is left out of the visible results.
+
+"""
+
+from .base.result import Result
+from .base.result import ScopedResult
+from .base.result import SKIPPED
+
+
+class _Alias(object):
+    """Returns the result of the identical feature."""
+    __slots__ = ('key',)
+
+    def __init__(self, key):
+        self.key = key
+
+    def __call__(self, data, result):
+        return result[self.key]
+
+
+class _Scoped(object):
+    """Calls the method with a scoped view of the results."""
+    __slots__ = ('method', 'scope')
+
+    def __init__(self, method, scope):
+        self.method = method
+        self.scope = scope
+
+    def __call__(self, data, result):
+        return self.method(data, ScopedResult(result, self.scope))
+
+
+class _Gated(object):
+    """Calls skip instead of process if the gate result is true."""
+    __slots__ = ('process', 'skip', 'gate')
+
+    def __init__(self, process, skip, gate):
+        self.process = process
+        self.skip = skip
+        self.gate = gate
+
+    def __call__(self, data, result):
+        if result[self.gate]:
+            return self.skip(data, result)
+        return self.process(data, result)
+
+
+class _GatedBatch(object):
+    """Processes the batch at once if no block is skipped by the gate,
+    else block by block."""
+    __slots__ = ('process_batch', 'process', 'skip', 'gate')
+
+    def __init__(self, process_batch, process, skip, gate):
+        self.process_batch = process_batch
+        self.process = process
+        self.skip = skip
+        self.gate = gate
+
+    def __call__(self, data, results):
+        skipped = results[self.gate]
+        if not any(skipped):
+            return self.process_batch(data, results)
+        result = Result()
+        outputs = []
+        items = list(results.items())
+        for i, framedata in enumerate(zip(*data)):
+            for name, values in items:
+                result._setitem(name, values[i])
+            if skipped[i]:
+                outputs.append(self.skip(framedata, result))
+            else:
+                outputs.append(self.process(framedata, result))
+        return outputs
+
+
+class _Decimated(object):
+    """Returns SKIPPED instead of processing if the decimation result
+    is true."""
+    __slots__ = ('process', 'decimation')
+
+    def __init__(self, process, decimation):
+        self.process = process
+        self.decimation = decimation
+
+    def __call__(self, data, result):
+        if result[self.decimation]:
+            return SKIPPED
+        return self.process(data, result)
+
+
+class _DecimatedBatch(object):
+    """Processes the batch of the blocks kept by the decimation.
+
+    Only the results of ``keys`` (the requirements of the feature, its
+    gate and decimation) are taken for the kept blocks, the results of
+    other features are neither read nor copied.
+
+    """
+    __slots__ = ('process_batch', 'decimation', 'keys')
+
+    def __init__(self, process_batch, decimation, keys):
+        self.process_batch = process_batch
+        self.decimation = decimation
+        self.keys = keys
+
+    def __call__(self, data, results):
+        skipped = results[self.decimation]
+        kept = [i for i, skip in enumerate(skipped) if not skip]
+        outputs = [SKIPPED] * len(skipped)
+        if kept:
+            data = tuple(_take(values, kept) for values in data)
+            results = Result(
+                (key, _take(results[key], kept)) for key in self.keys)
+            for i, output in zip(kept, self.process_batch(data, results)):
+                outputs[i] = output
+        return outputs
+
+
+def _take(values, indices):
+    """Returns the items of values at indices, stacked if they are arrays
+    of one shape."""
+    if hasattr(values, 'take'):
+        return values.take(indices, axis=0)
+    items = [values[i] for i in indices]
+    shape = getattr(items[0], 'shape', None)
+    if shape is not None and all(
+            getattr(item, 'shape', None) == shape for item in items):
+        import numpy as np  # the plan does not depend on numpy
+        return np.stack(items)
+    return items
+
+
+def _required_keys(featureset, key):
+    """Returns the keys of all features the feature of key reads, its
+    requirements and theirs, its gate and its decimation."""
+    keys = []
+    pending = list(featureset.requirements[key])
+    for gates in (featureset.gating(), featureset.decimation()):
+        if key in gates:
+            pending.append(gates[key])
+    while pending:
+        req = pending.pop()
+        if req not in keys:
+            keys.append(req)
+            pending.extend(featureset.requirements[req])
+    return tuple(k for k in featureset if k in keys)
+
+
+def _scoped(method, scope):
+    if scope:
+        return _Scoped(method, scope)
+    return method
+
+
+def feature_methods(featureset, batch=False):
+    """Yields ``(key, method)`` processing each feature of the featureset.
+
+    Parameters
+    ----------
+    featureset : FeatureSet
+    batch : bool
+        Whether to call ``process_batch`` instead of ``process``.
+
+    """
+    method = 'process_batch' if batch else 'process'
+    gating = featureset.gating()
+    decimation = featureset.decimation()
+    for key, feature in featureset.items():
+        scope = featureset.scopes.get(key)
+        if key in featureset.aliases:
+            process = _Alias(featureset.aliases[key])
+        elif key in gating and batch:
+            process = _GatedBatch(
+                _scoped(feature.process_batch, scope),
+                _scoped(feature.process, scope),
+                _scoped(feature.skip, scope),
+                gating[key])
+        elif key in gating:
+            process = _Gated(
+                _scoped(feature.process, scope),
+                _scoped(feature.skip, scope),
+                gating[key])
+        else:
+            process = _scoped(getattr(feature, method), scope)
+        if key in decimation and key not in featureset.aliases:
+            if batch:
+                process = _DecimatedBatch(
+                    process,
+                    decimation[key],
+                    _required_keys(featureset, key))
+            else:
+                process = _Decimated(process, decimation[key])
+        yield key, process
+
+
+class ExtractionPlan(object):
+    """Flat processing plan of a featureset.
+
+    Parameters
+    ----------
+    featureset : FeatureSet
+    batch : bool
+        Whether to call ``process_batch`` instead of ``process``.
+    profile : Profile
+        If given, the methods are timed by the profile's feature timers.
+
+    Attributes
+    ----------
+    steps : tuple
+        ``(key, method)`` pairs in order of the featureset.
+    visible : tuple
+        Keys of not hidden and not compact features.
+    compact : tuple
+        Keys of not hidden decimated or compact features, see
+        :py:attr:`sigfeat.base.Feature.compact`.
+    skipped : dict
+        Number of blocks skipped by each gate, counted by
+        :py:meth:`count_skipped`.
+
+    """
+    def __init__(self, featureset, batch=False, profile=None):
+        self.steps = tuple(feature_methods(featureset, batch))
+        if profile is not None:
+            self.steps = tuple(
+                (key, profile.features[key].timed(process))
+                for key, process in self.steps)
+        decimation = featureset.decimation()
+        self.visible = tuple(
+            key for key, feature in featureset.items()
+            if not feature.hidden and not (
+                key in decimation or feature.compact))
+        self.compact = tuple(
+            key for key, feature in featureset.items()
+            if not feature.hidden and (
+                key in decimation or feature.compact))
+        gates = set(featureset.gating().values())
+        self.gates = tuple(key for key in featureset if key in gates)
+        self.skipped = dict.fromkeys(self.gates, 0)
+
+    def __call__(self, data):
+        """Returns the Result of all features for ``data``."""
+        result = Result()
+        setitem = dict.__setitem__
+        for key, process in self.steps:
+            setitem(result, key, process(data, result))
+        return result
+
+    def count_skipped(self, result):
+        """Counts the gates marking the block of result to skip."""
+        for gate in self.gates:
+            value = result[gate]
+            if value is not SKIPPED and value:
+                self.skipped[gate] += 1
+
+    def visible_results(self, result):
+        """Returns a dict with the results of not hidden features.
+
+        Results of decimated and compact features are left out for
+        skipped blocks.
+
+        """
+        results = {key: result[key] for key in self.visible}
+        for key in self.compact:
+            value = result[key]
+            if value is not SKIPPED:
+                results[key] = value
+        return results
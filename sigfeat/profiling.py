@@ -0,0 +1,80 @@
+"""This module implements the profiling of extractions.
+
+If an extraction is profiled, the bound process methods of the features,
+the source generator and the ``receive_append`` method of the sink
+are wrapped by timers. Without profiling nothing is wrapped.
+
+"""
+
+from collections import OrderedDict
+from time import perf_counter
+
+
+class Timer(object):
+    """Accumulates the wall time and the number of calls."""
+    __slots__ = ('time', 'calls')
+
+    def __init__(self):
+        self.time = 0.0
+        self.calls = 0
+
+    def timed(self, func):
+        """Returns the function wrapped by this timer."""
+        def _timed(*args):
+            start = perf_counter()
+            try:
+                return func(*args)
+            finally:
+                self.time += perf_counter() - start
+                self.calls += 1
+        return _timed
+
+    def iterate(self, iterable):
+        """Yields the items of iterable, timing each step."""
+        iterator = iter(iterable)
+        while True:
+            start = perf_counter()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                self.time += perf_counter() - start
+                return
+            self.time += perf_counter() - start
+            self.calls += 1
+            yield item
+
+    def as_dict(self):
+        return {'time': self.time, 'calls': self.calls}
+
+
+class Profile(object):
+    """Timers of a featureset extraction.
+
+    Parameters
+    ----------
+    featureset : FeatureSet
+
+    Attributes
+    ----------
+    features : OrderedDict
+        Timer for each feature key.
+    source : Timer
+        Time spent in the source generator.
+    sink : Timer
+        Time spent in ``sink.receive_append``.
+
+    """
+    def __init__(self, featureset):
+        self.features = OrderedDict(
+            (key, Timer()) for key in featureset)
+        self.source = Timer()
+        self.sink = Timer()
+
+    def as_dict(self):
+        """Returns the times and calls as dict e.g. for a sink."""
+        return {
+            'features': {
+                name: timer.as_dict()
+                for name, timer in self.features.items()},
+            'source': self.source.as_dict(),
+            'sink': self.sink.as_dict()}
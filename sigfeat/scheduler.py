@@ -0,0 +1,114 @@
+"""This module implements the concurrent processing of features.
+
+The dependency graph of a featureset is built from the requirements of
+its features. Features are ready as soon as all their required features
+are processed and independent ready features are processed concurrently
+on a thread pool. This pays off for features spending their time in
+numpy or scipy functions releasing the GIL (e.g. ffts, dot products
+and reductions).
+
+All results a feature reads must come from its (transitive)
+requirements, see :py:meth:`sigfeat.base.Feature.requires`.
+
+"""
+
+from collections import OrderedDict
+from concurrent.futures import FIRST_COMPLETED
+from concurrent.futures import wait
+
+from .plan import feature_methods
+
+
+class FeatureGraph(object):
+    """Dependency graph of a featureset.
+
+    Parameters
+    ----------
+    featureset : FeatureSet
+
+    Attributes
+    ----------
+    requirements : OrderedDict
+        Keys of the required features for each feature key, including
+        gates, decimations and the features of aliases.
+    dependents : OrderedDict
+        Keys of the depending features for each feature key.
+
+    """
+    def __init__(self, featureset):
+        self.featureset = featureset
+        self.requirements = OrderedDict(
+            (key, set(featureset.requirements[key]).intersection(featureset))
+            for key in featureset)
+        # gated, decimated and aliased features read the result of their
+        # gate, decimation or original feature as well:
+        for edges in (featureset.gating(), featureset.decimation(),
+                      featureset.aliases):
+            for key, req in edges.items():
+                if key in self.requirements and req in featureset:
+                    self.requirements[key].add(req)
+        self.dependents = OrderedDict((name, []) for name in featureset)
+        for name, requirements in self.requirements.items():
+            for req in requirements:
+                self.dependents[req].append(name)
+
+    @property
+    def roots(self):
+        """Returns the keys of features without requirements."""
+        return [name for name, reqs in self.requirements.items() if not reqs]
+
+
+class ThreadedExecutor(object):
+    """Processes the features of a featureset concurrently.
+
+    Of the ready features, one is processed in the calling thread and the
+    others are submitted to the given pool.
+
+    Parameters
+    ----------
+    featureset : FeatureSet
+    pool : concurrent.futures.ThreadPoolExecutor
+    batch : bool
+        Whether to call ``process_batch`` instead of ``process``.
+    profile : Profile
+        If given, the methods are timed by the profile's feature timers.
+
+    """
+    def __init__(self, featureset, pool, batch=False, profile=None):
+        self.graph = FeatureGraph(featureset)
+        self.pool = pool
+        self._methods = dict(feature_methods(featureset, batch))
+        if profile is not None:
+            self._methods = {
+                name: profile.features[name].timed(func)
+                for name, func in self._methods.items()}
+        self._indegrees = {
+            name: len(reqs) for name, reqs in self.graph.requirements.items()}
+        self._roots = self.graph.roots
+
+    def __call__(self, data, result):
+        """Processes all features for ``data`` into ``result``."""
+        indegrees = dict(self._indegrees)
+        ready = list(self._roots)
+        running = {}
+        while ready or running:
+            while len(ready) > 1:
+                name = ready.pop()
+                future = self.pool.submit(self._methods[name], data, result)
+                running[future] = name
+            done = []
+            if ready:
+                name = ready.pop()
+                done.append((name, self._methods[name](data, result)))
+                finished = [f for f in running if f.done()]
+            else:
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                done.append((running.pop(future), future.result()))
+            for name, output in done:
+                result._setitem(name, output)
+                for dependent in self.graph.dependents[name]:
+                    indegrees[dependent] -= 1
+                    if not indegrees[dependent]:
+                        ready.append(dependent)
+        return result
@@ -1,4 +1,5 @@
 from collections import defaultdict
+from collections import OrderedDict
 
 from ..base import Sink
 
@@ -8,16 +9,29 @@ class DefaultDictSink(Sink, dict):
 
     The receive_append method appends input to 'results' defaultdict(list)
 
+    The results of segmented sources (e.g. the files of a CorpusSource)
+    are appended to the columns of their segment in
+    ``'segments'`` OrderedDict as well.
+
     """
     def __init__(self):
         self.results = defaultdict(list)
         self['results'] = self.results
+        self.segment = None
 
     def receive(self, datad):
         """Updates the dict with given ``datad`` dictionary."""
         self.update(datad)
 
+    def receive_segment(self, segment):
+        """Appends the following results to the columns of segment too."""
+        segments = self.setdefault('segments', OrderedDict())
+        self.segment = segments.setdefault(segment, defaultdict(list))
+
     def receive_append(self, resultd):
         """Appends given ``resultd`` dict to list fields in this dict."""
         for name, res in resultd.items():
             self.results[name] += [res]
+        if self.segment is not None:
+            for name, res in resultd.items():
+                self.segment[name].append(res)
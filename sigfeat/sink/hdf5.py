@@ -15,17 +15,29 @@ class Hdf5Sink(Sink, h5py.File):  # pragma: no coverage
     A better way would be DefaultDictSink and writing this once into
     a hdf file.
 
+    The results of segmented sources (e.g. the files of a CorpusSource)
+    are appended to the datasets of the group ``segments/<segment>``
+    as well. Each dataset has its own length, the results of decimated
+    features are only appended for the blocks they are processed for.
+
     """
     def __init__(self, *args, **kwargs):
         h5py.File.__init__(self, *args, **kwargs)
-        self._pos = 0
+        self._pos = dict()
         self._chunksize = 10000
         self._columns = dict()
+        self._segment = None
 
     def receive(self, datad):
         """Receives a dictionary and directly writes it into hdf5 file."""
         _dump_dict_to_hdf(datad, self)
 
+    def receive_segment(self, segment):
+        """Appends the following results to the datasets of the group
+        ``segments/<segment>`` too."""
+        self._segment = self.require_group('segments').require_group(
+            str(segment))
+
     def receive_append(self, resultd):
         """Appends the given dictionary to datasets in h5 file.
         If the key does not exist, a new resizable dataset is created.
@@ -33,6 +45,13 @@ class Hdf5Sink(Sink, h5py.File):  # pragma: no coverage
         will be resized.
 
         """
+        self._append(self, resultd)
+        if self._segment is not None:
+            self._append(self._segment, resultd)
+
+    def _append(self, group, resultd):
+        # one position per dataset, the columns of decimated and compact
+        # features are shorter than the others:
         for name, res in resultd.items():
             if name not in self._columns:
                 if hasattr(res, '__iter__'):
@@ -41,21 +60,23 @@ class Hdf5Sink(Sink, h5py.File):  # pragma: no coverage
                     cols = 1
                 self._columns[name] = cols
 
-            if name not in self:
-                self.create_dataset(
+            if name not in group:
+                group.create_dataset(
                     name,
                     shape=(self._chunksize, self._columns[name]),
                     maxshape=(None, self._columns[name]))
 
-            ds = self[name]
-            if ds.shape[0] <= self._pos:
+            ds = group[name]
+            pos = self._pos.get(ds.name, 0)
+            if ds.shape[0] <= pos:
                 ds.resize((ds.shape[0]+self._chunksize, self._columns[name]))
-            ds[self._pos, ...] = res
-            self._pos += 1
+            ds[pos, ...] = res
+            self._pos[ds.name] = pos + 1
 
     def tighten_length(self):
-        for key, num in self._columns.items():
-            self[key].resize((self._pos, num))
+        for dsname, pos in self._pos.items():
+            ds = self[dsname]
+            ds.resize((pos, ds.shape[1]))
 
 
 def _dump_dict_to_hdf(d, hdf):  # pragma: no coverage
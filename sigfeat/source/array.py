@@ -1,38 +1,154 @@
-from numpy import asarray, product
+from hashlib import sha1
+
+from numpy import arange, asarray, ascontiguousarray, concatenate, product
+from numpy import full
+from numpy.lib.stride_tricks import as_strided
 
 from ..base import Source
+from ..base import Parameter
+
+
+TAIL_POLICIES = ('drop', 'pad', 'partial')
+
+
+def frame_view(array, blocksize, blockshift):
+    """Returns read-only view of all complete blocks of array.
+
+    The blocks are stacked along a new first axis, so the view has the
+    shape ``(frames, blocksize) + array.shape[1:]``. No data is copied.
+
+    """
+    array = asarray(array)
+    frames = max(0, (len(array) - blocksize) // blockshift + 1)
+    return as_strided(
+        array,
+        shape=(frames, blocksize) + array.shape[1:],
+        strides=(blockshift*array.strides[0],) + array.strides,
+        writeable=False)
 
 
 class ArraySource(Source):
     """Source class for iterable arrays.
 
+    The blocks are generated from a read-only strided view of the array
+    without copying, see :py:meth:`frames`.
+
     Parameters
     ----------
     array : ndarray
         Expects an iterable array with .shape tuple.
     samplerate : int
     name : str
+    offset : int
+        Index of the first sample of the array, is added to the indices.
     blocksize : int
     overlap : int
+    tail : {'drop', 'pad', 'partial'}
+        The samples after the last complete block are dropped (default),
+        generated as block filled up with zeros ('pad') or as shorter
+        block ('partial'), which the features must be able to process.
 
     """
+    tail = Parameter(default='drop')
+    _padvalue = 0
 
-    def __init__(self, array, samplerate, name='', **parameters):
+    def __init__(self, array, samplerate, name='', offset=0, **parameters):
         array = asarray(array)
         self.unroll_parameters(parameters)
+        if self.tail not in TAIL_POLICIES:
+            raise ValueError('Unknown tail policy {!r}.'.format(self.tail))
         self._array = array
         self.channels = product(array.shape[1:])
         self.add_metadata('name', name)
         self.add_metadata('arraylen', len(array))
         self.add_metadata('channels', self.channels)
         self.add_metadata('samplerate', samplerate)
+        self.add_metadata('offset', offset)
         self.fetch_metadata_as_attrs()
 
+    def content_hash(self):
+        """Returns hash of the array data, samplerate and offset."""
+        array = ascontiguousarray(self._array)
+        hsh = sha1(repr((
+            array.shape,
+            array.dtype.str,
+            self.samplerate,
+            self.offset)).encode())
+        hsh.update(array.data)
+        return hsh.hexdigest()
+
+    def frames(self):
+        """Returns read-only view of all complete blocks of the array.
+
+        The shape is ``(frames, blocksize) + array.shape[1:]``.
+
+        """
+        return frame_view(
+            self._array, self.blocksize, self.blocksize-self.overlap)
+
+    def _tail(self, framecount):
+        """Returns the tail block and its index or None."""
+        index = framecount * (self.blocksize-self.overlap)
+        covered = index + self.overlap if framecount else 0
+        if self.tail == 'drop' or len(self._array) <= covered:
+            return None
+        block = self._array[index:]
+        if self.tail == 'pad':
+            fill = full(
+                (self.blocksize - len(block),) + block.shape[1:],
+                self._padvalue,
+                dtype=block.dtype)
+            block = concatenate((block, fill))
+        return block, index
+
+    def framecount(self):
+        """Returns the number of generated blocks."""
+        framecount = len(self.frames())
+        return framecount + (self._tail(framecount) is not None)
+
+    def chunk(self, start, stop):
+        """Returns an ArraySource generating the blocks start until stop."""
+        blockshift = self.blocksize - self.overlap
+        begin = start * blockshift
+        end = (stop - 1) * blockshift + self.blocksize
+        return ArraySource(
+            self._array[begin:end],
+            samplerate=self.samplerate,
+            name=self.name,
+            offset=self.offset+begin,
+            **dict(self.parameters))
+
     def generate(self):
         """Returns generator that yields blocks out of the array."""
-        indexrange = range(
-            0,
-            len(self._array)-self.blocksize+1,
-            self.blocksize-self.overlap)
-        for index in indexrange:
-            yield self._array[index:index+self.blocksize], index
+        frames = self.frames()
+        blockshift = self.blocksize - self.overlap
+        for i, block in enumerate(frames):
+            yield block, i*blockshift + self.offset
+        tail = self._tail(len(frames))
+        if tail is not None:
+            yield tail[0], tail[1] + self.offset
+
+    def generate_batches(self, batchsize):
+        """Returns generator that yields batches of blocks.
+
+        The batches are slices of the strided view of the array.
+        A padded tail block is appended to the last batch if it is not
+        full, a partial tail block is yielded as batch of its own.
+
+        """
+        frames = self.frames()
+        indices = arange(len(frames)) * (self.blocksize-self.overlap)
+        indices += self.offset
+        tail = self._tail(len(frames))
+        for start in range(0, len(frames), batchsize):
+            blocks = frames[start:start+batchsize]
+            index = indices[start:start+batchsize]
+            if (tail is not None and self.tail == 'pad'
+                    and start + batchsize >= len(frames)
+                    and len(blocks) < batchsize):
+                blocks = concatenate((blocks, tail[0][None]))
+                index = concatenate((index, [tail[1] + self.offset]))
+                tail = None
+            yield blocks, index
+        if tail is not None:
+            yield tail[0][None], asarray([tail[1] + self.offset])
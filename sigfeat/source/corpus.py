@@ -0,0 +1,108 @@
+"""Source streaming the blocks of many files in one extraction.
+
+Instead of one extraction with newly instantiated features per file,
+a :py:class:`CorpusSource` generates the blocks of all files one after
+another as ``(block, index, file_id)``, where ``index`` is the sample
+index within the file. The features are started once and restarted
+before each file (see :py:meth:`sigfeat.base.Feature.restart`), the
+sink receives each file id before the results of the file (see
+:py:meth:`sigfeat.sink.DefaultDictSink.receive_segment`).
+
+Example
+-------
+
+.. code:
+
+    corpus = CorpusSource(paths, blocksize=1024, overlap=512)
+    sink = extractor.extract(corpus, DefaultDictSink(), batchsize=64)
+    mfccs = sink['segments'][paths[0]]['MFCC']
+
+"""
+
+from soundfile import info
+
+from ..base import Source
+from .soundfile import SoundFileSource
+
+
+class CorpusSource(Source):
+    """Source generating the blocks of many sound files one after another.
+
+    All files must have the same samplerate and channels, given sources
+    the blocksize and overlap of the CorpusSource as well.
+    The batches of :py:meth:`generate_batches` do not span files.
+
+    Parameters
+    ----------
+    files : sequence of str or Source instances
+        Paths of sound files opened as SoundFileSource with the
+        parameters, or sources generating ``(block, index)``.
+    ids : sequence
+        The unique file ids, default are the paths (or the positions of
+        the sources).
+    blocksize : int
+    overlap : int
+    **parameters :
+        Further parameters of the SoundFileSources, e.g. ``dtype``.
+
+    """
+    segmented = True
+
+    def __init__(self, files, ids=None, **parameters):
+        self.unroll_parameters(parameters)
+        self.files = list(files)
+        if ids is None:
+            ids = [f if isinstance(f, str) else i
+                   for i, f in enumerate(self.files)]
+        self.ids = list(ids)
+        if len(self.ids) != len(self.files):
+            raise ValueError('Number of ids and files differ.')
+        if len(set(self.ids)) != len(self.ids):
+            raise ValueError('The file ids must be unique.')
+        self._parameters_of_files = parameters
+        samplerate, channels = (
+            self._format(self.files[0]) if self.files else (None, None))
+        self.add_metadata('samplerate', samplerate)
+        self.add_metadata('channels', channels)
+        self.add_metadata('filecount', len(self.files))
+        self.fetch_metadata_as_attrs()
+
+    @staticmethod
+    def _format(file):
+        """Returns samplerate and channels of file."""
+        if isinstance(file, Source):
+            return file.samplerate, file.channels
+        fileinfo = info(file)
+        return fileinfo.samplerate, fileinfo.channels
+
+    def _source(self, file):
+        if isinstance(file, Source):
+            if (file.blocksize, file.overlap) != (
+                    self.blocksize, self.overlap):
+                raise ValueError(
+                    'The sources must have the blocksize and overlap '
+                    'of the CorpusSource.')
+            return file
+        return SoundFileSource(file, **self._parameters_of_files)
+
+    def sources(self):
+        """Yields file id and source of each file."""
+        for file_id, file in zip(self.ids, self.files):
+            if self._format(file) != (self.samplerate, self.channels):
+                raise ValueError(
+                    'File {!r} has another samplerate or channels than '
+                    'the first file.'.format(file_id))
+            yield file_id, self._source(file)
+
+    def generate(self):
+        """Returns generator that yields ``(block, index, file_id)``."""
+        for file_id, source in self.sources():
+            for data in source.generate():
+                yield data[0], data[1], file_id
+
+    def generate_batches(self, batchsize):
+        """Returns generator that yields ``(blocks, indices, file_ids)``
+        batches of each file."""
+        for file_id, source in self.sources():
+            for data in source.generate_batches(batchsize):
+                yield data[0], data[1], [file_id] * len(data[0])
@@ -0,0 +1,210 @@
+"""Source of memory mapped WAV or raw PCM files.
+
+The sample region of the file is mapped with :py:class:`numpy.memmap`
+and framed with a strided view, so the blocks are read from the page
+cache of the operating system without decoding copies. Integer samples
+are converted to float per block (or per batch). Worker processes
+mapping the same file share its pages.
+
+Example
+-------
+
+.. code:
+
+    src = MemmapSource('long.wav', blocksize=1024, dtype='float32')
+    raw = MemmapSource('long.pcm', samplerate=48000, channels=8,
+                       subtype='<i2')
+
+"""
+
+import struct
+
+from hashlib import sha1
+
+import numpy as np
+
+from ..base import Parameter
+from .array import ArraySource
+
+
+WAVE_FORMAT_PCM = 1
+WAVE_FORMAT_IEEE_FLOAT = 3
+WAVE_FORMAT_EXTENSIBLE = 0xFFFE
+
+
+def read_wav_header(path):
+    """Returns samplerate, channels, sample dtype, offset and length of
+    the data chunk of a little endian WAV file.
+
+    Supports 8, 16 and 32 bit integer and 32 and 64 bit float samples.
+
+    """
+    with open(path, 'rb') as f:
+        riff, _, wave = struct.unpack('<4sI4s', f.read(12))
+        if riff != b'RIFF' or wave != b'WAVE':
+            raise ValueError('{} is not a RIFF WAVE file.'.format(path))
+        fmt = None
+        while True:
+            header = f.read(8)
+            if len(header) < 8:
+                raise ValueError('{} has no data chunk.'.format(path))
+            chunkid, chunksize = struct.unpack('<4sI', header)
+            if chunkid == b'fmt ':
+                fmt = f.read(chunksize)
+                f.seek(chunksize % 2, 1)
+            elif chunkid == b'data':
+                offset = f.tell()
+                break
+            else:
+                f.seek(chunksize + chunksize % 2, 1)
+    if fmt is None:
+        raise ValueError('{} has no fmt chunk.'.format(path))
+    formattag, channels, samplerate, _, _, bits = struct.unpack(
+        '<HHIIHH', fmt[:16])
+    if formattag == WAVE_FORMAT_EXTENSIBLE:
+        formattag, = struct.unpack('<H', fmt[24:26])
+    if formattag == WAVE_FORMAT_PCM and bits in (8, 16, 32):
+        subtype = 'u1' if bits == 8 else '<i{}'.format(bits // 8)
+    elif formattag == WAVE_FORMAT_IEEE_FLOAT and bits in (32, 64):
+        subtype = '<f{}'.format(bits // 8)
+    else:
+        raise ValueError(
+            'Unsupported WAV format {} with {} bits.'.format(
+                formattag, bits))
+    length = chunksize // (channels * bits // 8)
+    return samplerate, channels, subtype, offset, length
+
+
+class MemmapSource(ArraySource):
+    """Source generating blocks from a memory mapped WAV or raw PCM file.
+
+    If no samplerate is given, the file is read as WAV file, otherwise
+    as raw PCM file with the given channels, subtype and headersize.
+
+    Parameters
+    ----------
+    path : str
+    samplerate : int
+        Samplerate of a raw PCM file.
+    channels : int
+        Channels of a raw PCM file.
+    subtype : str
+        Numpy dtype of the samples of a raw PCM file, e.g. ``'<i2'``.
+    headersize : int
+        Bytes before the samples of a raw PCM file.
+    start : int
+        First sample to generate blocks from.
+    frames : int
+        The number of samples to generate blocks from.
+        If frames < 0, the file is read until the end.
+    blocksize : int
+    overlap : int
+    tail : {'drop', 'pad', 'partial'}
+        See :py:class:`sigfeat.source.array.ArraySource`.
+    dtype : {'float64', 'float32'}
+        Dtype of the generated blocks.
+
+    """
+    dtype = Parameter(default='float64')
+
+    def __init__(self, path, samplerate=None, channels=1, subtype='<i2',
+                 headersize=0, start=0, frames=-1, **parameters):
+        if samplerate is None:
+            samplerate, channels, subtype, headersize, length = (
+                read_wav_header(path))
+        else:
+            itemsize = np.dtype(subtype).itemsize * channels
+            with open(path, 'rb') as f:
+                f.seek(0, 2)
+                length = (f.tell() - headersize) // itemsize
+        self._mapping = (path, subtype, headersize, length, channels)
+        array = self._map()[start:]
+        if frames >= 0:
+            array = array[:frames]
+        super(MemmapSource, self).__init__(
+            array, samplerate, name=path, offset=start, **parameters)
+        if np.dtype(self.dtype).kind != 'f':
+            raise ValueError('MemmapSource generates float blocks only.')
+        self.add_metadata('subtype', subtype)
+        self.fetch_metadata_as_attrs()
+        self._frames = frames
+        kind = np.dtype(subtype).kind
+        if kind == 'u':
+            self._zero = 2**(8*np.dtype(subtype).itemsize - 1)
+            self._scale = 1.0 / self._zero
+            self._padvalue = self._zero
+        elif kind == 'i':
+            self._zero = 0
+            self._scale = 1.0 / 2**(8*np.dtype(subtype).itemsize - 1)
+        else:
+            self._zero = 0
+            self._scale = None
+
+    def _map(self):
+        path, subtype, headersize, length, channels = self._mapping
+        shape = (length, channels) if channels > 1 else (length,)
+        return np.memmap(
+            path, dtype=subtype, mode='r', offset=headersize, shape=shape)
+
+    def convert(self, blocks):
+        """Returns blocks (or batches) of samples as float of dtype."""
+        if self._scale is None:
+            return blocks.astype(self.dtype, copy=False)
+        converted = blocks.astype(self.dtype)
+        if self._zero:
+            converted -= self._zero
+        converted *= self._scale
+        return converted
+
+    def content_hash(self):
+        """Returns hash of the file content, start, frames, the layout of
+        the samples, samplerate and dtype."""
+        hsh = sha1(repr((
+            self.offset,
+            self._frames,
+            self._mapping[1:],
+            self.samplerate,
+            self.dtype)).encode())
+        with open(self.name, 'rb') as f:
+            for chunk in iter(lambda: f.read(2**20), b''):
+                hsh.update(chunk)
+        return hsh.hexdigest()
+
+    def chunk(self, start, stop):
+        """Returns a MemmapSource generating the blocks start until stop."""
+        blockshift = self.blocksize - self.overlap
+        begin = start * blockshift
+        end = min((stop - 1) * blockshift + self.blocksize, len(self._array))
+        path, subtype, headersize, length, channels = self._mapping
+        return MemmapSource(
+            path,
+            samplerate=self.samplerate,
+            channels=channels,
+            subtype=subtype,
+            headersize=headersize,
+            start=self.offset+begin,
+            frames=end-begin,
+            **dict(self.parameters))
+
+    def __getstate__(self):
+        """Returns the state for pickling, the file is mapped again when
+        unpickled."""
+        state = self.__dict__.copy()
+        state['_array'] = (self.offset, len(self._array))
+        return state
+
+    def __setstate__(self, state):
+        start, frames = state.pop('_array')
+        self.__dict__.update(state)
+        self._array = self._map()[start:start+frames]
+
+    def generate(self):
+        """Returns generator that yields converted blocks of the file."""
+        for block, index in super(MemmapSource, self).generate():
+            yield self.convert(block), index
+
+    def generate_batches(self, batchsize):
+        """Returns generator that yields converted batches of blocks."""
+        batches = super(MemmapSource, self).generate_batches(batchsize)
+        for blocks, indices in batches:
+            yield self.convert(blocks), indices
@@ -1,9 +1,67 @@
+from hashlib import sha1
+from queue import Queue, Full
+from threading import Event, Thread
+
 from soundfile import SoundFile
 
 from ..base import Source
 from ..base import Parameter
 
 
+_END = object()
+
+
+def read_ahead(blocks, depth):
+    """Returns generator yielding the items of blocks read ahead.
+
+    A background thread reads up to ``depth`` items in advance into a
+    bounded queue. Exceptions of the reading are raised in the
+    generator. The thread is stopped if the generator is closed early.
+
+    Parameters
+    ----------
+    blocks : iterable
+    depth : int
+        Maximum number of items read in advance.
+
+    """
+    queue = Queue(maxsize=depth)
+    stop = Event()
+
+    def put(item):
+        while not stop.is_set():
+            try:
+                queue.put(item, timeout=0.1)
+                return True
+            except Full:
+                continue
+        return False
+
+    def read():
+        try:
+            for block in blocks:
+                if not put((block, None)):
+                    return
+        except Exception as error:
+            put((_END, error))
+        else:
+            put((_END, None))
+
+    thread = Thread(target=read, daemon=True)
+    thread.start()
+    try:
+        while True:
+            block, error = queue.get()
+            if block is _END:
+                if error is not None:
+                    raise error
+                return
+            yield block
+    finally:
+        stop.set()
+        thread.join()
+
+
 class SoundFileSource(Source):
     """Source generating data from SoundFiles.
 
@@ -24,12 +82,18 @@ class SoundFileSource(Source):
         See :meth:`soundfile.SoundFile.read`.
     always_2d : bool
         Indicates wether all blocks are at least 2d numpy arrays.
+    prefetch : int
+        If prefetch > 0, the blocks are decoded by a background thread
+        up to prefetch blocks ahead of the extraction, see
+        :py:func:`read_ahead`. libsndfile releases the GIL while
+        decoding, so decoding and feature computation overlap.
 
     """
     frames = Parameter(default=-1)
     fill_value = Parameter(default=0)
     dtype = Parameter(default='float64')
     always_2d = Parameter(default=False)
+    prefetch = Parameter(default=0)
 
     def __init__(self, sf=None, **parameters):
         self.unroll_parameters(parameters)
@@ -49,18 +113,201 @@ class SoundFileSource(Source):
             yield attr, getattr(sf, attr)
         yield 'length', len(sf)
 
-    def generate(self):
-        """Returns generator that yields blocks from the SoundFile."""
+    def content_hash(self):
+        """Returns hash of the sound file content and current position.
+
+        The SoundFile must be opened from a path.
+
+        """
+        if not isinstance(self.name, str):
+            raise ValueError(
+                'Only a SoundFileSource opened from a path can be hashed.')
+        hsh = sha1(str(self.sf.tell()).encode())
+        with open(self.name, 'rb') as f:
+            for chunk in iter(lambda: f.read(2**20), b''):
+                hsh.update(chunk)
+        return hsh.hexdigest()
+
+    def framecount(self):
+        """Returns the number of blocks generated from current position."""
+        if self.frames > 0:
+            remaining = self.frames
+        else:
+            remaining = self.length - self.sf.tell()
+        if remaining <= 0:
+            return 0
+        blockshift = self.blocksize - self.overlap
+        return 1 + max(0, -(-(remaining - self.blocksize) // blockshift))
+
+    def chunk(self, start, stop):
+        """Returns a SoundFileSource generating the blocks start until stop.
+
+        The SoundFile is reopened by its name, so it must be a path.
+
+        """
+        if not isinstance(self.name, str):
+            raise ValueError(
+                'Only a SoundFileSource opened from a path can be chunked.')
+        blockshift = self.blocksize - self.overlap
+        parameters = dict(self.parameters)
+        if stop < self.framecount():
+            parameters['frames'] = (
+                (stop - start - 1) * blockshift + self.blocksize)
+        elif self.frames > 0:
+            parameters['frames'] = self.frames - start * blockshift
+        source = SoundFileSource(self.name, **parameters)
+        source.sf.seek(self.sf.tell() + start * blockshift)
+        return source
+
+    def __getstate__(self):
+        """Returns the state for pickling, the SoundFile is reopened
+        by its name when unpickled."""
+        if not isinstance(self.name, str):
+            raise TypeError(
+                'Only a SoundFileSource opened from a path can be pickled.')
+        state = self.__dict__.copy()
+        state['sf'] = 0 if self.sf.closed else self.sf.tell()
+        return state
+
+    def __setstate__(self, state):
+        position = state.pop('sf')
+        self.__dict__.update(state)
+        self.sf = SoundFile(self.name)
+        self.sf.seek(position)
+
+    def _blocks(self, frames):
+        """Returns generator of the blocks of frames samples from the
+        current position of the SoundFile."""
         blocks = self.sf.blocks(
             blocksize=self.blocksize,
             overlap=self.overlap,
-            frames=self.frames,
+            frames=frames,
             dtype=self.dtype,
             fill_value=self.fill_value,
             always_2d=self.always_2d)
+        if self.prefetch > 0:
+            blocks = read_ahead(blocks, self.prefetch)
+        return blocks
+
+    def generate(self):
+        """Returns generator that yields blocks from the SoundFile."""
+        blocks = self._blocks(self.frames)
         blockshift = self.blocksize - self.overlap
         index = self.sf.tell()
         for block in blocks:
             yield block, index
             index += blockshift
         self.sf.close()
+
+
+class SegmentSource(SoundFileSource):
+    """Source generating the blocks of segments of a SoundFile.
+
+    The SoundFile is seeked to the start of each segment, so only the
+    samples of the segments are decoded. The blocks of each segment are
+    generated like by a SoundFileSource of the segment, the last block
+    is filled up with fill_value. The source is segmented, it yields
+    ``(block, index, segment_id)`` with the sample index in the file,
+    so the features are restarted and the sink receives the
+    ``segment_id`` before each segment (see :py:class:`sigfeat.base.Source`).
+
+    Parameters
+    ----------
+    sf : SoundFile instance or str
+    segments : sequence of (start, stop)
+        Ranges of the segments, stop is exclusive and limited to the
+        length of the file.
+    ids : sequence
+        The unique segment ids, default are the positions of the segments.
+    unit : {'samples', 'seconds'}
+        Unit of start and stop.
+    blocksize : int
+    overlap : int
+    fill_value : scalar
+    dtype : {'float64', 'float32', 'int32', 'int16'}, optional
+    always_2d : bool
+    prefetch : int
+        See :py:class:`SoundFileSource`.
+
+    """
+    segmented = True
+
+    def __init__(self, sf=None, segments=(), ids=None, unit='samples',
+                 **parameters):
+        super(SegmentSource, self).__init__(sf, **parameters)
+        if unit == 'seconds':
+            segments = [
+                (int(round(start * self.samplerate)),
+                 int(round(stop * self.samplerate)))
+                for start, stop in segments]
+        elif unit != 'samples':
+            raise ValueError('Unknown unit {!r}.'.format(unit))
+        self.segments = [
+            (start, min(stop, self.length)) for start, stop in segments]
+        if ids is None:
+            ids = range(len(self.segments))
+        self.ids = list(ids)
+        if len(self.ids) != len(self.segments):
+            raise ValueError('Number of ids and segments differ.')
+        if len(set(self.ids)) != len(self.ids):
+            raise ValueError('The segment ids must be unique.')
+
+    def content_hash(self):
+        """Returns hash of the sound file content and the segments."""
+        hsh = sha1(super(SegmentSource, self).content_hash().encode())
+        hsh.update(repr((self.segments, self.ids)).encode())
+        return hsh.hexdigest()
+
+    def _segment_framecounts(self):
+        blockshift = self.blocksize - self.overlap
+        for start, stop in self.segments:
+            if stop <= start:
+                yield 0
+            else:
+                yield 1 + max(
+                    0, -(-(stop - start - self.blocksize) // blockshift))
+
+    def framecount(self):
+        """Returns the number of blocks generated from all segments."""
+        return sum(self._segment_framecounts())
+
+    def chunk(self, start, stop):
+        """Returns a SegmentSource generating the blocks start until stop.
+
+        The segments are cut at the blocks start and stop, the parts keep
+        the ids of their segments. The SoundFile is reopened by its name,
+        so it must be a path.
+
+        """
+        if not isinstance(self.name, str):
+            raise ValueError(
+                'Only a SegmentSource opened from a path can be chunked.')
+        blockshift = self.blocksize - self.overlap
+        segments, ids = [], []
+        first = 0
+        for segment_id, (begin, end), count in zip(
+                self.ids, self.segments, self._segment_framecounts()):
+            lo, hi = max(start - first, 0), min(stop - first, count)
+            if lo < hi:
+                segments.append((
+                    begin + lo*blockshift,
+                    end if hi == count else
+                    begin + (hi-1)*blockshift + self.blocksize))
+                ids.append(segment_id)
+            first += count
+        return SegmentSource(
+            self.name, segments, ids=ids, **dict(self.parameters))
+
+    def generate(self):
+        """Returns generator that yields ``(block, index, segment_id)``
+        of the segments of the SoundFile."""
+        blockshift = self.blocksize - self.overlap
+        for segment_id, (start, stop) in zip(self.ids, self.segments):
+            if stop <= start:
+                continue
+            self.sf.seek(start)
+            index = start
+            for block in self._blocks(stop - start):
+                yield block, index, segment_id
+                index += blockshift
+        self.sf.close()
@@ -0,0 +1,198 @@
+"""This module implements push based streaming extraction.
+
+A :py:class:`Stream` is opened by :py:meth:`Extractor.open_stream` and
+acts as the source of the extraction. Samples are pushed e.g. from an
+audio callback and the results of all completed blocks are returned.
+
+Allocation profile:
+
+- On opening, the :py:class:`RingBuffer` of ``2 * blocksize * channels``
+  samples is allocated (unless a shared one is given) and ``on_start`` of
+  all features is called once.
+- Per push, a list for the results is allocated and, if the pushed
+  samples do not have the dtype of the stream, one converted copy.
+- Per completed block, one Result and one result dict are allocated plus
+  whatever the features allocate. Blocks are views into the ring buffer,
+  so framing and overlap allocate nothing.
+
+A push of ``n`` samples processes at most ``ceil(n / (blocksize-overlap))``
+blocks, each block is processed exactly once.
+
+"""
+
+import numpy as np
+
+from .base import Source
+from .base import Parameter
+from .plan import ExtractionPlan
+
+
+class RingBuffer(object):
+    """Mirrored ring buffer of the last ``size`` written samples.
+
+    Each sample is written twice, at its position and ``size`` samples
+    after it, so any run of up to ``size`` of the last samples is a
+    contiguous view. Several Streams can read their blocks from one
+    RingBuffer with their own read positions, see :py:meth:`Stream.pull`.
+
+    Parameters
+    ----------
+    size : int
+        Number of samples kept, at least the largest blocksize read.
+    channels : int
+    dtype : str
+
+    """
+    def __init__(self, size, channels=1, dtype='float64'):
+        shape = (2 * size,)
+        if channels > 1:
+            shape += (channels,)
+        self.size = size
+        self.buffer = np.zeros(shape, dtype=dtype)
+        self.count = 0
+
+    def frames(self, samples):
+        """Returns samples as array of the dtype and channels."""
+        samples = np.asarray(samples, dtype=self.buffer.dtype)
+        return samples.reshape((-1,) + self.buffer.shape[1:])
+
+    def write(self, samples):
+        """Writes up to size samples into both halves of the buffer."""
+        size = self.size
+        buf = self.buffer
+        pos = self.count % size
+        end = pos + len(samples)
+        if end <= size:
+            buf[pos:end] = samples
+            buf[pos+size:end+size] = samples
+        else:
+            split = size - pos
+            buf[pos:size] = samples[:split]
+            buf[pos+size:] = samples[:split]
+            buf[:end-size] = samples[split:]
+            buf[size:end] = samples[split:]
+        self.count += len(samples)
+
+    def view(self, start, length):
+        """Returns view of ``length`` samples from the ``start``-th written
+        sample on, which must be among the last size samples."""
+        pos = start % self.size
+        return self.buffer[pos:pos+length]
+
+
+class Stream(Source):
+    """Push based Source of an extraction session.
+
+    The blocks given to the features are views into the ring buffer and
+    are only valid while processing. Features keeping the block itself must
+    copy it.
+
+    Parameters
+    ----------
+    extractor : Extractor instance
+    samplerate : scalar
+    channels : int
+    sink : Sink instance
+        If given, it receives the results of each block and the metadata
+        on :py:meth:`close`.
+    offset : int
+        Index of the first pushed sample, is added to the indices.
+    ring : RingBuffer instance
+        If given, the blocks are read from this (shared) ring buffer
+        starting at its current count, see :py:meth:`pull`.
+    blocksize : int
+    overlap : int
+    dtype : str
+        Data type of the ring buffer.
+
+    """
+    dtype = Parameter(default='float64')
+
+    def __init__(self, extractor, samplerate, channels=1, sink=None,
+                 offset=0, ring=None, **parameters):
+        self.unroll_parameters(parameters)
+        self.add_metadata('samplerate', samplerate)
+        self.add_metadata('channels', channels)
+        self.add_metadata('offset', offset)
+        self.fetch_metadata_as_attrs()
+        if self.blocksize - self.overlap < 1:
+            raise ValueError('The overlap must be smaller than the blocksize.')
+
+        if ring is None:
+            ring = RingBuffer(self.blocksize, channels, self.dtype)
+        elif ring.size < self.blocksize:
+            raise ValueError('The ring buffer is smaller than the blocksize.')
+        self._ring = ring
+        self._next = ring.count
+
+        self.extractor = extractor
+        self.sink = sink
+        extractor._start(self, sink)
+        self._plan = ExtractionPlan(extractor.featureset)
+
+    @property
+    def missing(self):
+        """Number of samples missing for the next block."""
+        return self._next + self.blocksize - self._ring.count
+
+    def generate(self):
+        """A Stream is push based, see :py:meth:`push`."""
+        raise TypeError('Samples must be pushed into a Stream.')
+
+    def push(self, samples):
+        """Pushes samples and returns the results of completed blocks.
+
+        Parameters
+        ----------
+        samples : ndarray
+            Shape ``(n,)`` or ``(n, channels)``.
+
+        Returns
+        -------
+        results : list
+            Result dicts (without hidden features) for each completed block.
+
+        """
+        samples = self._ring.frames(samples)
+        results = []
+        start = 0
+        while start < len(samples):
+            stop = start + min(self.missing, len(samples) - start)
+            self._ring.write(samples[start:stop])
+            start = stop
+            results += self.pull()
+        return results
+
+    def pull(self):
+        """Processes the completed blocks written to the ring buffer and
+        returns their results.
+
+        Samples must be written in pieces of at most :py:attr:`missing`
+        samples, each followed by a pull, so no block is overwritten
+        before it is processed.
+
+        """
+        results = []
+        blockshift = self.blocksize - self.overlap
+        while self.missing <= 0:
+            block = self._ring.view(self._next, self.blocksize)
+            index = self.offset + self._next
+            result = self._plan((block, index))
+            self._plan.count_skipped(result)
+            result = self._plan.visible_results(result)
+            if self.sink is not None:
+                self.sink.receive_append(result)
+            results.append(result)
+            self._next += blockshift
+        return results
+
+    def close(self):
+        """Finishes the extraction, returns the sink."""
+        self.extractor._finish(self, self.sink, skipped=self._plan.skipped)
+        return self.sink
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
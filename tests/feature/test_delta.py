@@ -1,3 +1,4 @@
+import pytest
 import numpy as np
 
 from sigfeat.base import Feature
@@ -7,6 +8,11 @@ from sigfeat.extractor import Extractor
 from sigfeat.sink import DefaultDictSink
 
 
+class Block(Feature):
+    def process(self, data, res):
+        return data[0][0]
+
+
 def test_delta():
     class A(Feature):
         def process(self, data, res):
@@ -22,10 +28,63 @@ def test_delta():
     assert np.allclose(np.array(res['A']).flatten(), x)
     assert np.mean(np.array(res['dA']).flatten()[1:]) == 2.0
     assert np.mean(np.array(res['ddA']).flatten()[2:]) == 0.0
-    assert res['dA'][0] is None
-    assert res['ddA'][0] is None
+    assert res['dA'][0] == 0.0
+    assert res['ddA'][1] == 2.0
+
+
+def test_delta_padding_nan():
+    x = np.random.randn(6, 3)
+    src = ArraySource(x, samplerate=1, blocksize=1, channels=3)
+    ex = Extractor(Delta(Block(), order=2, padding='nan'))
+    res = np.array(ex.extract(src, DefaultDictSink())['results']['ddBlock'])
+    assert res.shape == (6, 3)
+    assert np.all(np.isnan(res[:2]))
+    assert np.allclose(res[2:], np.diff(x, 2, axis=0))
+
+
+def regression(x, width):
+    """Returns the regression deltas of x with edge padding."""
+    padded = np.concatenate([x[:1]] * width + [x] + [x[-1:]] * width)
+    n = np.arange(-width, width + 1)[:, np.newaxis]
+    return np.array([
+        np.sum(n * padded[m:m+2*width+1], axis=0) / np.sum(n*n)
+        for m in range(len(x))])
+
+
+@pytest.mark.parametrize('batchsize', [None, 1, 4])
+def test_delta_regression(batchsize):
+    x = np.random.randn(20, 2)
+    src = ArraySource(x, samplerate=1, blocksize=1, channels=2)
+    ex = Extractor(Delta(Block(), width=2))
+    snk = ex.extract(src, DefaultDictSink(), batchsize=batchsize)
+    res = np.array(snk['results']['dBlock'])
+    expected = regression(x, 2)
+    assert res.shape == (18, 2)
+    assert np.allclose(res[0], (x[1] + 2*x[2] - 3*x[0]) / 10)
+    assert np.allclose(res[-1], (x[18] + 2*x[19] - x[16] - 2*x[15]) / 10)
+    assert np.allclose(res, expected[:18])
+    assert list(snk['results']['dBlock_index']) == list(range(18))
+    assert len(snk['results']['Block']) == 20
+
+
+@pytest.mark.parametrize('batchsize', [None, 3])
+def test_delta_regression_of_delta(batchsize):
+    x = np.random.randn(20, 2)
+    src = ArraySource(x, samplerate=1, blocksize=1, channels=2)
+    ex = Extractor(Delta(Delta(Block(), width=2), width=1))
+    snk = ex.extract(src, DefaultDictSink(), batchsize=batchsize)
+    deltas = regression(x, 2)[:18]
+    res = np.array(snk['results']['ddBlock'])
+    assert np.allclose(res, regression(deltas, 1)[:17])
+    assert list(snk['results']['ddBlock_index']) == list(range(17))
+
+
+def test_delta_invalid():
+    with pytest.raises(ValueError):
+        Delta(Block(), width=2, order=2)
+    with pytest.raises(ValueError):
+        Delta(Block(), padding='zero')
 
 
 if __name__ == '__main__':
-    import pytest
     pytest.main()  # pragma: no coverage
@@ -158,5 +158,28 @@ def test_features_to_featureset():
             [D()]
         )
 
+
+def test_featureset_dedupe_by_fid():
+    fset = features_to_featureset([A(param=1), B(), C()])
+    assert list(fset) == ['A', 'a', 'B', 'b1', 'C']
+    assert fset.aliases == {'a': 'A'}
+    assert fset.requirements['B'] == ['a']
+
+    fset = features_to_featureset(
+        [B(requirements=[A(param=1).hide()], name='b1'),
+         B(requirements=[A(param=2).hide()], name='b2')])
+    assert list(fset) == ['A', 'b1', 'A#2', 'b2']
+    assert fset.scopes['b2'] == {'A': 'A#2'}
+    assert fset.scoped('b2')['A'] is fset['A#2']
+    assert fset.scoped('b1') is fset
+
+
+def test_featureset_consistent():
+    c = C(param=1)
+    assert list(c.featureset()) == list(features_to_featureset([c]))
+    fset = features_to_featureset([A(param='First A').hide(), B(), A()])
+    assert fset['A'].param == 'First A'
+
+
 if __name__ == '__main__':
     pytest.main()   # pragma: no coverage
@@ -8,6 +8,7 @@ from sigfeat.sink import DefaultDictSink
 from sigfeat.feature.mfcc import MelSpectrum
 from sigfeat.feature.mfcc import LogMelSpectrum
 from sigfeat.feature.mfcc import MFCC
+from sigfeat.feature.mfcc import dct_matrix
 
 
 def mkas():
@@ -25,6 +26,20 @@ def test_mel_spectrum():
     snk = ext.extract(src, DefaultDictSink())
 
 
+@pytest.mark.parametrize('batchsize', [None, 5])
+def test_mel_spectrum_sparse(batchsize):
+    x = np.random.randn(16384, 2)
+    src = ArraySource(x, samplerate=44100, blocksize=2048)
+    ext = Extractor(MelSpectrum().hide(False))
+    snk = ext.extract(src, DefaultDictSink(), batchsize=batchsize)
+    melspec = ext.featureset['MelSpectrum']
+    windowed = ext.featureset['WindowedSignal'].w * x[-2048:]
+    absrfft = np.abs(np.fft.rfft(windowed, axis=0))
+    assert np.allclose(
+        snk['results']['MelSpectrum'][-1], np.dot(melspec.melmat, absrfft))
+    assert melspec.filters.nnz < melspec.melmat.size / 10
+
+
 def test_log_mel_spectrum():
     src = mkas()
     ext = Extractor(LogMelSpectrum().hide(False))
@@ -37,5 +52,34 @@ def test_mfcc():
     snk = ext.extract(src, DefaultDictSink())
 
 
+def test_mfcc_batches():
+    src = mkas()
+    ext = Extractor(MFCC())
+    snk = ext.extract(src, DefaultDictSink())
+    ext = Extractor(MFCC())
+    snkb = ext.extract(src, DefaultDictSink(), batchsize=5)
+    assert np.allclose(snk['results']['MFCC'], snkb['results']['MFCC'])
+
+
+@pytest.mark.parametrize('numbins', [8, 20, 30])
+def test_dct_matrix(numbins):
+    from scipy.fftpack import dct
+    x = np.random.randn(20)
+    assert np.allclose(
+        np.dot(dct_matrix(numbins, 20), x), dct(x, type=2, n=numbins))
+
+
+def test_mfcc_silence():
+    x = np.random.randn(8*1024)
+    x[2048:4096] = 0
+    src = ArraySource(x, samplerate=44100, blocksize=1024)
+    ext = Extractor(MFCC(), MFCC(name='lifted', lifter=22))
+    res = ext.extract(src, DefaultDictSink(), batchsize=3)['results']
+    assert np.all(np.isfinite(res['MFCC']))
+    n = np.arange(20)
+    assert np.allclose(
+        res['lifted'], np.array(res['MFCC'])*(1 + 11*np.sin(np.pi*n/22)))
+
+
 if __name__ == '__main__':
     pytest.main()  # pragma: no coverage
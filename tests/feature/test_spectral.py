@@ -11,6 +11,7 @@ from sigfeat.feature.spectral import SpectralSpread
 from sigfeat.feature.spectral import SpectralSkewness
 from sigfeat.feature.spectral import SpectralKurtosis
 from sigfeat.feature.spectral import SpectralSlope
+from sigfeat.feature.temporal import Silence
 
 from sigfeat.source.array import ArraySource
 from sigfeat.extractor import Extractor
@@ -63,5 +64,136 @@ def test_spectral_features_no_window_branch():
     etr.extract(src, DefaultDictSink())
 
 
+def test_spectral_features_batches():
+    x = np.random.randn(44100, 2)
+    results = []
+    for batchsize in (None, 8):
+        features = [
+            SpectralCentroid(),
+            SpectralFlatness(),
+            SpectralFlux(),
+            SpectralCrestFactor(),
+            SpectralRolloff(),
+            SpectralSpread(),
+            SpectralSkewness(),
+            SpectralKurtosis(),
+            SpectralSlope(),
+        ]
+        etr = Extractor(*features)
+        src = ArraySource(
+            x,
+            samplerate=44100,
+            blocksize=2048,
+            overlap=1024)
+        snk = etr.extract(src, DefaultDictSink(), batchsize=batchsize)
+        results.append(snk['results'])
+    for name, values in results[0].items():
+        assert np.allclose(values, results[1][name])
+
+
+@pytest.mark.parametrize('batchsize', [None, 4])
+def test_spectral_flux_gated(batchsize):
+    x = np.random.randn(10*1024)
+    x[3*1024:5*1024] = 0
+    ex = Extractor(SpectralFlux().gated(Silence()))
+    res = ex.extract(
+        ArraySource(x, samplerate=44100, blocksize=1024),
+        DefaultDictSink(),
+        batchsize=batchsize)['results']
+    assert np.all(np.isnan(res['SpectralFlux'][3:5]))
+    after = Extractor(SpectralFlux()).extract(
+        ArraySource(x[5*1024:], samplerate=44100, blocksize=1024),
+        DefaultDictSink())['results']
+    assert np.allclose(res['SpectralFlux'][5:], after['SpectralFlux'])
+
+
+def test_spectral_moments():
+    x = np.random.randn(8192, 2)
+    features = [
+        SpectralCentroid(),
+        SpectralSpread(),
+        SpectralSkewness(),
+        SpectralKurtosis(),
+    ]
+    etr = Extractor(*features)
+    src = ArraySource(x, samplerate=44100, blocksize=2048)
+    res = etr.extract(src, DefaultDictSink())['results']
+    freqs = etr.featureset['AbsRfft'].frequencies[:, np.newaxis]
+    windowed = etr.featureset['WindowedSignal'].w * x[-2048:]
+    absrffts = etr.featureset['AbsRfft'].process(
+        None, {'Rfft': etr.featureset['Rfft'].process(
+            None, {'WindowedSignal': windowed})})
+    weights = absrffts / np.sum(absrffts, axis=0)
+    centroid = np.sum(freqs * weights, axis=0)
+    spread = np.sum((freqs - centroid)**2 * weights, axis=0)
+    skewness = np.sum((freqs - centroid)**3 * weights, axis=0) / spread**1.5
+    kurtosis = np.sum((freqs - centroid)**4 * weights, axis=0) / spread**2
+    assert np.allclose(res['SpectralCentroid'][-1], centroid)
+    assert np.allclose(res['SpectralSpread'][-1], spread)
+    assert np.allclose(res['SpectralSkewness'][-1], skewness)
+    assert np.allclose(res['SpectralKurtosis'][-1], kurtosis)
+
+
+@pytest.mark.parametrize('batchsize', [None, 2])
+def test_spectral_moments_pure_tone(batchsize):
+    x = np.sin(15000*2*np.pi*np.arange(8192)/48000)
+    features = [SpectralSkewness(), SpectralKurtosis()]
+    etr = Extractor(*features)
+    src = ArraySource(x, samplerate=48000, blocksize=2048)
+    res = etr.extract(src, DefaultDictSink(), batchsize=batchsize)['results']
+    freqs = etr.featureset['AbsRfft'].frequencies
+    absrfft = np.abs(np.fft.rfft(
+        etr.featureset['WindowedSignal'].w * x[:2048]))
+    weights = absrfft / np.sum(absrfft)
+    centroid = np.sum(freqs * weights)
+    spread = np.sum((freqs - centroid)**2 * weights)
+    skewness = np.sum((freqs - centroid)**3 * weights) / spread**1.5
+    kurtosis = np.sum((freqs - centroid)**4 * weights) / spread**2
+    assert np.isclose(res['SpectralSkewness'][0], skewness, rtol=1e-6)
+    assert np.isclose(res['SpectralKurtosis'][0], kurtosis, rtol=1e-6)
+
+
+@pytest.mark.parametrize('dtype', ['float64', 'float32'])
+def test_abs_rfft_half_spectrum(dtype):
+    from sigfeat.feature.spectral import AbsRfft
+    x = np.random.randn(8192, 2).astype(dtype)
+    results = []
+    for batchsize, workers in ((None, None), (4, 2)):
+        etr = Extractor(AbsRfft(nfft=1024, workers=workers).hide(False))
+        src = ArraySource(x, samplerate=44100, blocksize=1024)
+        snk = etr.extract(src, DefaultDictSink(), batchsize=batchsize)
+        results.append(np.array(snk['results']['AbsRfft']))
+    assert results[0].shape == (8, 513, 2)
+    assert results[0].dtype == dtype
+    assert np.allclose(results[0], results[1])
+    assert len(etr.featureset['AbsRfft'].frequencies) == 513
+    assert etr.featureset['AbsRfft'].frequencies[-1] == 22050
+    assert AbsRfft(workers=2).fid == AbsRfft().fid
+    assert AbsRfft(workers=2).new().workers == 2
+
+
+def test_spectral_rolloff():
+    x = np.sin(1000*2*np.pi*np.arange(4096)/44100)
+    etr = Extractor(SpectralRolloff())
+    src = ArraySource(x, samplerate=44100, blocksize=4096)
+    res = etr.extract(src, DefaultDictSink())['results']
+    assert abs(res['SpectralRolloff'][0] - 1000) < 2 * 44100 / 4096
+
+
+@pytest.mark.parametrize('batchsize', [None, 4])
+def test_spectral_slope(batchsize):
+    x = np.random.randn(8192, 2)
+    etr = Extractor(SpectralSlope())
+    src = ArraySource(x, samplerate=44100, blocksize=1024)
+    res = etr.extract(src, DefaultDictSink(), batchsize=batchsize)['results']
+    freqs = etr.featureset['AbsRfft'].frequencies[:, np.newaxis]
+    windowed = etr.featureset['WindowedSignal'].w * x[-1024:]
+    absrfft = np.abs(np.fft.rfft(windowed, axis=0))
+    for channel in range(2):
+        spec = absrfft[:, channel] - np.mean(absrfft[:, channel])
+        slope = np.linalg.lstsq(freqs, spec, rcond=None)[0][0]
+        assert np.isclose(res['SpectralSlope'][-1][channel], slope)
+
+
 if __name__ == '__main__':
     pytest.main()  # pragma: no coverage
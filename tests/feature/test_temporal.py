@@ -12,6 +12,7 @@ from sigfeat.feature.temporal import Peak
 from sigfeat.feature.temporal import Kurtosis
 from sigfeat.feature.temporal import Skewness
 from sigfeat.feature.temporal import StandardDeviation
+from sigfeat.feature.temporal import Silence
 
 from sigfeat.source.array import ArraySource
 from sigfeat.extractor import Extractor
@@ -42,5 +43,87 @@ def test_temporal_features():
     assert abs(1-np.median(res['Peak'])) < 1e-4
 
 
+def test_temporal_features_batches():
+    x = np.random.randn(44100)
+    results = []
+    for batchsize in (None, 8):
+        features = [
+            CrestFactor(),
+            ZeroCrossingRate(),
+            StatMoments(),
+            CentroidAbsSignal(),
+            FlatnessAbsSignal(),
+            RootMeanSquare(),
+            Peak(),
+            Kurtosis(),
+            Skewness(),
+            StandardDeviation(),
+        ]
+        ex = Extractor(*features)
+        src = ArraySource(x, samplerate=44100, blocksize=1024, overlap=512)
+        snk = ex.extract(src, DefaultDictSink(), batchsize=batchsize)
+        results.append(snk['results'])
+    for name, values in results[0].items():
+        assert np.allclose(values, results[1][name])
+
+
+@pytest.mark.parametrize('batchsize', [None, 3])
+def test_silence(batchsize):
+    x = np.random.randn(4096, 2)
+    x[1024:2048] = 0
+    x[3072:, 0] = 0
+    src = ArraySource(x, samplerate=1, blocksize=512)
+    silence = Silence().hide(False)
+    quiet = Silence(threshold=10, name='quiet').hide(False)
+    snk = Extractor(
+        silence,
+        quiet,
+        Peak().gated(silence),
+        Peak(name='QuietPeak').gated(quiet)
+    ).extract(src, DefaultDictSink(), batchsize=batchsize)
+    res = snk['results']
+    assert list(res['Silence']) == [False]*2 + [True]*2 + [False]*4
+    assert all(res['quiet'])
+    assert snk['features']['Silence']['metadata']['skipped'] == 2
+    assert snk['features']['quiet']['metadata']['skipped'] == 8
+
+
+@pytest.mark.parametrize('batchsize', [None, 3])
+def test_temporal_stats(batchsize):
+    from scipy.stats import skew, kurtosis
+    x = np.random.randn(4096, 3)
+    ex = Extractor(
+        Peak(), RootMeanSquare(), StandardDeviation(), Skewness(),
+        Kurtosis(), ZeroCrossingRate(), StatMoments())
+    src = ArraySource(x, samplerate=1024, blocksize=1024)
+    res = ex.extract(src, DefaultDictSink(), batchsize=batchsize)['results']
+    assert list(ex.featureset).count('TemporalStats') == 1
+    block = x[-1024:]
+    signs = np.sign(block)
+    crossings = 0.5 * np.sum(np.abs(np.diff(signs, axis=0)), axis=0)
+    assert np.allclose(res['Peak'][-1], np.max(np.abs(block), axis=0))
+    assert np.allclose(
+        res['RootMeanSquare'][-1], np.sqrt(np.mean(block**2, axis=0)))
+    assert np.allclose(res['StandardDeviation'][-1], np.std(block, axis=0))
+    assert np.allclose(res['Skewness'][-1], skew(block, axis=0))
+    assert np.allclose(res['Kurtosis'][-1], kurtosis(block, axis=0))
+    assert np.allclose(res['ZeroCrossingRate'][-1], np.round(crossings))
+    mu, variance, skewness, kurt = res['StatMoments'][-1]
+    assert np.allclose(mu, np.mean(block, axis=0))
+    assert np.allclose(variance, np.var(block, axis=0, ddof=1))
+    assert np.allclose(kurt, kurtosis(block, axis=0, fisher=False))
+    ex = Extractor(Peak(), RootMeanSquare())
+    assert 'TemporalMoments' not in ex.featureset
+
+
+def test_zero_crossings_with_zeros():
+    x = np.array([1., 0., -1., 0., 0., 2., -0., 3., -1., 0.])
+    signs = np.sign(x)
+    expected = np.round(0.5 * np.sum(np.abs(np.diff(signs))))
+    assert ZeroCrossingRate.crossings(x, 0) == expected
+    assert np.all(ZeroCrossingRate.crossings(
+        np.stack((x, -x)), 1) == expected)
+
+
 if __name__ == '__main__':
     pytest.main()  # pragma: no coverage
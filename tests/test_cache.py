@@ -0,0 +1,93 @@
+import os
+import pytest
+import numpy as np
+
+from sigfeat.base import Feature
+from sigfeat.base import Parameter
+from sigfeat.cache import FeatureCache
+from sigfeat.extractor import Extractor
+from sigfeat.source.array import ArraySource
+from sigfeat.sink import DefaultDictSink
+
+
+CALLS = {}
+
+
+class Sum(Feature):
+    factor = Parameter(1)
+
+    def process(self, data, result):
+        CALLS[self.name] = CALLS.get(self.name, 0) + 1
+        return np.sum(data[0]) * self.factor
+
+
+class Double(Feature):
+    def requires(self):
+        yield Sum(factor=2).hide()
+
+    def process(self, data, result):
+        CALLS[self.name] = CALLS.get(self.name, 0) + 1
+        return 2 * result['Sum']
+
+
+def mksrc(x):
+    return ArraySource(x, samplerate=1, blocksize=10)
+
+
+def test_feature_cache(tmp_path):
+    CALLS.clear()
+    cache = FeatureCache(str(tmp_path))
+    x = np.random.randn(100)
+    snk = Extractor(Sum(name='A')).extract(
+        mksrc(x), DefaultDictSink(), cache=cache)
+    assert CALLS == {'A': 10}
+    snk2 = Extractor(Sum(name='A'), Double()).extract(
+        mksrc(x), DefaultDictSink(), cache=cache)
+    assert CALLS == {'A': 10, 'Sum': 10, 'Double': 10}
+    assert snk2['results']['A'] == snk['results']['A']
+    assert np.allclose(snk2['results']['Double'], 4 * np.array(
+        snk['results']['A']))
+    assert 'Sum' not in snk2['results']
+
+    snk3 = Extractor(Sum(name='A'), Double()).extract(
+        mksrc(x), DefaultDictSink(), batchsize=3, cache=cache)
+    assert CALLS == {'A': 10, 'Sum': 10, 'Double': 10}
+    assert snk3['results'] == snk2['results']
+    assert 'features' in snk3
+
+    Extractor(Sum(name='A', factor=3)).extract(
+        mksrc(x), DefaultDictSink(), cache=cache)
+    Extractor(Sum(name='A')).extract(
+        mksrc(x + 1), DefaultDictSink(), cache=cache)
+    assert CALLS['A'] == 30
+
+
+def test_feature_cache_eviction(tmp_path):
+    cache = FeatureCache(str(tmp_path), maxsize=1)
+    cache.store('a', [1, 2, 3])
+    assert cache.load('a') is None
+    cache.maxsize = None
+    cache.store('a', [1, 2, 3])
+    cache.store('b', [1])
+    os.utime(cache._path('a'), (1, 1))
+    os.utime(cache._path('b'), (2, 2))
+    assert cache.load('a') == [1, 2, 3]
+    cache.maxsize = cache.size() - 1
+    cache.evict()
+    assert cache.load('a') == [1, 2, 3]
+    assert cache.load('b') is None
+    cache.clear()
+    assert cache.size() == 0
+
+
+def test_feature_cache_segmented(tmp_path):
+    from sigfeat.source.corpus import CorpusSource
+    corpus = CorpusSource(
+        [ArraySource(np.ones(8), samplerate=1, blocksize=4)], blocksize=4)
+    with pytest.raises(ValueError):
+        Extractor(Sum(name='A')).extract(
+            corpus, DefaultDictSink(), cache=FeatureCache(str(tmp_path)))
+
+
+if __name__ == '__main__':
+    pytest.main()  # pragma: no coverage
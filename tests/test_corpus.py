@@ -0,0 +1,87 @@
+import pytest
+import numpy as np
+
+from soundfile import write
+
+from sigfeat.base import Feature
+from sigfeat.extractor import Extractor
+from sigfeat.feature import Delta
+from sigfeat.feature import Index
+from sigfeat.feature import RootMeanSquare
+from sigfeat.feature import SpectralFlux
+from sigfeat.sink import DefaultDictSink
+from sigfeat.source.array import ArraySource
+from sigfeat.source.corpus import CorpusSource
+
+
+class Counter(Feature):
+    def on_start(self, source, featureset, sink):
+        self.starts = getattr(self, 'starts', 0) + 1
+        self.count = 0
+
+    def restart(self):
+        self.count = 0
+
+    def process(self, data, result):
+        self.count += 1
+        return self.count
+
+
+def features():
+    return [Index(), SpectralFlux(), Delta(RootMeanSquare()), Counter()]
+
+
+@pytest.fixture
+def paths(tmpdir):
+    paths = []
+    for i, length in enumerate((5000, 3000, 7000)):
+        path = str(tmpdir.join('{}.wav'.format(i)))
+        write(path, np.random.randn(length) * 0.1, 8000)
+        paths.append(path)
+    return paths
+
+
+@pytest.mark.parametrize('batchsize', [None, 2])
+def test_corpus_source(paths, batchsize):
+    extractor = Extractor(*features())
+    corpus = CorpusSource(paths, blocksize=512, overlap=256)
+    sink = extractor.extract(corpus, DefaultDictSink(), batchsize=batchsize)
+    assert extractor.featureset['Counter'].starts == 1
+    assert list(sink['segments']) == paths
+    for path in paths:
+        separate = Extractor(*features()).extract(
+            CorpusSource([path], blocksize=512, overlap=256),
+            DefaultDictSink())['results']
+        segment = sink['segments'][path]
+        assert segment['Index'][0] == 0
+        for name in ('SpectralFlux', 'dRootMeanSquare', 'Counter'):
+            assert np.allclose(segment[name], separate[name])
+    assert len(sink['results']['Index']) == sum(
+        len(sink['segments'][path]['Index']) for path in paths)
+
+
+def test_corpus_source_of_sources():
+    sources = [
+        ArraySource(np.random.randn(n), samplerate=1, blocksize=4)
+        for n in (10, 13)]
+    corpus = CorpusSource(sources, ids=['a', 'b'], blocksize=4)
+    assert corpus.samplerate == 1
+    assert [(idx, fid) for blk, idx, fid in corpus] == [
+        (0, 'a'), (4, 'a'), (0, 'b'), (4, 'b'), (8, 'b')]
+    with pytest.raises(ValueError):
+        list(CorpusSource(sources, blocksize=8))
+    with pytest.raises(ValueError):
+        CorpusSource(sources, ids=['a'])
+    with pytest.raises(ValueError):
+        CorpusSource(sources, ids=['a', 'a'])
+
+
+def test_corpus_source_format_mismatch(paths, tmpdir):
+    path = str(tmpdir.join('other.wav'))
+    write(path, np.zeros(1000), 44100)
+    with pytest.raises(ValueError):
+        list(CorpusSource(paths + [path]))
+
+
+if __name__ == '__main__':
+    pytest.main()  # pragma: no coverage
@@ -1,6 +1,8 @@
 import pytest
 
 from sigfeat.base import Feature
+from sigfeat.base import HiddenFeature
+from sigfeat.base import Parameter
 from sigfeat.extractor import Extractor
 from sigfeat.source.array import ArraySource
 from sigfeat.sink import DefaultDictSink
@@ -16,6 +18,25 @@ class A(Feature):
         return int(data[0])
 
 
+class Gain(HiddenFeature):
+    gain = Parameter(1)
+    calls = 0
+
+    def process(self, data, fdata):
+        Gain.calls += 1
+        return self.gain * int(data[0])
+
+
+class Out(Feature):
+    gain = Parameter(1)
+
+    def requires(self):
+        yield Gain(gain=self.gain)
+
+    def process(self, data, fdata):
+        return fdata['Gain']
+
+
 def test_extractor_with_sink():
     ex = Extractor(A(), A(name='hidden_a').hide())
     sc = ArraySource(
@@ -44,5 +65,67 @@ def test_extractor_without_sink():
     assert ex.featureset['A']._started is False
 
 
+def test_extractor_batches():
+    ex = Extractor(A(), A(name='hidden_a').hide())
+    sc = ArraySource(
+        list(range(10)),
+        blocksize=1,
+        overlap=0,
+        samplerate=1)
+    sk = ex.extract(sc, DefaultDictSink(), batchsize=3)
+    assert list(sk['results']['A']) == list(range(10))
+    assert 'hidden_a' not in sk['results']
+
+    ex.reset()
+    for i, res in enumerate(ex.extract(sc, batchsize=4)):
+        assert i == res['A']
+
+
+@pytest.mark.parametrize('batchsize', [None, 4])
+def test_extractor_dedupe(batchsize):
+    sc = ArraySource(
+        list(range(10)),
+        blocksize=1,
+        overlap=0,
+        samplerate=1)
+    Gain.calls = 0
+    ex = Extractor(Out(name='one'), Out(name='also_one'))
+    sk = ex.extract(sc, DefaultDictSink(), batchsize=batchsize)
+    assert list(sk['results']['one']) == list(range(10))
+    assert list(sk['results']['also_one']) == list(range(10))
+    assert Gain.calls == 10
+
+    ex = Extractor(Out(name='one'), Out(name='two', gain=2))
+    sk = ex.extract(sc, DefaultDictSink(), batchsize=batchsize)
+    assert list(sk['results']['one']) == list(range(10))
+    assert list(sk['results']['two']) == list(range(0, 20, 2))
+
+
+@pytest.mark.parametrize('batchsize', [None, 3])
+def test_extractor_every(batchsize):
+    sc = ArraySource(
+        list(range(10)),
+        blocksize=1,
+        overlap=0,
+        samplerate=1)
+    Gain.calls = 0
+    ex = Extractor(A(), Out(name='one', every=4), Out(name='two', every=4))
+    assert ex.featureset['one'].every == 4
+    sk = ex.extract(sc, DefaultDictSink(), batchsize=batchsize)
+    assert list(sk['results']['A']) == list(range(10))
+    assert list(sk['results']['one']) == [0, 4, 8]
+    assert list(sk['results']['one_index']) == [0, 4, 8]
+    assert list(sk['results']['two_index']) == [0, 4, 8]
+    assert Gain.calls == 3
+
+
+def test_import_without_numpy():
+    import subprocess
+    import sys
+    code = 'import sys, sigfeat.extractor; print("numpy" in sys.modules)'
+    out = subprocess.check_output([sys.executable, '-c', code])
+    assert out.strip() == b'False'
+
+
 if __name__ == '__main__':
     pytest.main()  # pragma: no coverage
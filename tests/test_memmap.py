@@ -0,0 +1,86 @@
+import pickle
+
+import pytest
+import numpy as np
+
+from soundfile import write, read
+
+from sigfeat.source.memmap import MemmapSource
+from sigfeat.source.memmap import read_wav_header
+
+
+@pytest.fixture
+def signal():
+    x = np.random.randn(5000, 2)
+    return 0.9 * x / np.max(np.abs(x))
+
+
+@pytest.mark.parametrize('subtype', ['PCM_U8', 'PCM_16', 'PCM_32', 'FLOAT'])
+def test_memmap_source_wav(tmpdir, signal, subtype):
+    path = str(tmpdir.join('x.wav'))
+    write(path, signal, 44100, subtype=subtype)
+    expected, samplerate = read(path)
+    src = MemmapSource(path, blocksize=1024, overlap=256, tail='pad')
+    assert src.samplerate == 44100
+    assert src.channels == 2
+    blocks = list(src)
+    assert len(blocks) == src.framecount() == 7
+    for block, index in blocks[:-1]:
+        assert block.dtype == np.float64
+        assert np.allclose(block, expected[index:index+1024])
+    block, index = blocks[-1]
+    assert np.allclose(block[:5000-index], expected[index:])
+    assert np.all(block[5000-index:] == 0)
+    batches = list(src.generate_batches(3))
+    assert np.allclose(
+        np.concatenate([b for b, i in batches]), [b for b, i in blocks])
+
+
+def test_memmap_source_raw(tmpdir):
+    x = (np.arange(4000) - 2000).astype('<i2')
+    path = str(tmpdir.join('x.pcm'))
+    with open(path, 'wb') as f:
+        f.write(b'\0' * 16)
+        f.write(x.tobytes())
+    src = MemmapSource(
+        path, samplerate=8000, subtype='<i2', headersize=16,
+        blocksize=1000, dtype='float32')
+    blocks = list(src)
+    assert len(blocks) == 4
+    assert blocks[1][0].dtype == np.float32
+    assert np.allclose(blocks[1][0], x[1000:2000] / 2**15)
+    assert [index for block, index in blocks] == [0, 1000, 2000, 3000]
+    stereo = MemmapSource(
+        path, samplerate=8000, channels=2, subtype='<i2', headersize=16,
+        blocksize=1000, dtype='float32')
+    assert stereo.content_hash() != src.content_hash()
+    assert MemmapSource(
+        path, samplerate=4000, subtype='<i2', headersize=16,
+        blocksize=1000, dtype='float32').content_hash() != src.content_hash()
+
+
+def test_memmap_source_chunk_and_pickle(tmpdir, signal):
+    path = str(tmpdir.join('x.wav'))
+    write(path, signal, 44100, subtype='PCM_16')
+    src = MemmapSource(path, blocksize=512, overlap=128)
+    blocks = list(src)
+    chunk = pickle.loads(pickle.dumps(src.chunk(2, 6)))
+    assert chunk.framecount() == 4
+    for (blk, idx), (cblk, cidx) in zip(blocks[2:6], chunk):
+        assert idx == cidx
+        assert np.all(blk == cblk)
+    assert read_wav_header(path)[:4] == (44100, 2, '<i2', 44)
+
+
+def test_memmap_source_invalid(tmpdir):
+    path = str(tmpdir.join('x.pcm'))
+    with open(path, 'wb') as f:
+        f.write(b'\0' * 64)
+    with pytest.raises(ValueError):
+        MemmapSource(path)
+    with pytest.raises(ValueError):
+        MemmapSource(path, samplerate=1, dtype='int16')
+
+
+if __name__ == '__main__':
+    pytest.main()  # pragma: no coverage
@@ -0,0 +1,85 @@
+import pytest
+import numpy as np
+
+from sigfeat.base import Feature
+from sigfeat.extractor import Extractor
+from sigfeat.multires import FeatureGroup
+from sigfeat.source.array import ArraySource
+from sigfeat.sink import DefaultDictSink
+
+
+class Sum(Feature):
+    def process(self, data, result):
+        return np.sum(data[0], axis=0)
+
+
+class Index(Feature):
+    def process(self, data, result):
+        return data[1]
+
+
+def extract(x, blocksize, overlap, offset=0):
+    return Extractor(Sum(), Index()).extract(
+        ArraySource(x, samplerate=1, blocksize=blocksize, overlap=overlap,
+                    offset=offset),
+        DefaultDictSink())['results']
+
+
+@pytest.mark.parametrize('channels', [1, 2])
+@pytest.mark.parametrize('batchsize', [None, 7])
+def test_feature_groups(channels, batchsize):
+    x = np.random.randn(10000, channels).squeeze()
+    ex = Extractor(
+        Sum(), Index(),
+        groups=[FeatureGroup('long', Sum(), Index(), blocksize=1024,
+                             overlap=512),
+                FeatureGroup('short', Sum(), Index(), blocksize=64)])
+    snk = ex.extract(
+        ArraySource(x, samplerate=1, blocksize=256, overlap=128, offset=5),
+        DefaultDictSink(),
+        batchsize=batchsize)
+    results = snk['results']
+    expected = extract(x, 256, 128, 5)
+    assert results['Index'] == expected['Index']
+    expected = extract(x, 1024, 512, 5)
+    assert results['long/Index'] == expected['Index']
+    assert np.allclose(results['long/Sum'], expected['Sum'])
+    expected = extract(x[:9984], 64, 0, 5)
+    assert results['short/Index'] == expected['Index']
+    assert np.allclose(results['short/Sum'], expected['Sum'])
+    assert 'long/features' in snk
+    assert 'features' in snk
+
+
+@pytest.mark.parametrize('batchsize', [None, 7])
+def test_feature_groups_padded_tail(batchsize):
+    x = np.random.randn(10000)
+    ex = Extractor(
+        Sum(), Index(),
+        groups=[FeatureGroup('long', Sum(), Index(), blocksize=1024,
+                             overlap=512),
+                FeatureGroup('short', Sum(), Index(), blocksize=80)])
+    snk = ex.extract(
+        ArraySource(x, samplerate=1, blocksize=256, overlap=128,
+                    tail='pad'),
+        DefaultDictSink(),
+        batchsize=batchsize)
+    results = snk['results']
+    assert results['Index'][-1] + 256 > len(x)
+    for name, blocksize, overlap in (('long', 1024, 512), ('short', 80, 0)):
+        expected = extract(x, blocksize, overlap)
+        assert results[name + '/Index'] == expected['Index']
+        assert np.allclose(results[name + '/Sum'], expected['Sum'])
+
+
+def test_feature_groups_errors():
+    ex = Extractor(Sum(), groups=[FeatureGroup('long', Sum())])
+    src = ArraySource(np.ones(10), samplerate=1)
+    with pytest.raises(ValueError):
+        ex.extract(src)
+    with pytest.raises(ValueError):
+        ex.extract_chunked(src, DefaultDictSink())
+
+
+if __name__ == '__main__':
+    pytest.main()  # pragma: no coverage
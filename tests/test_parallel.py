@@ -0,0 +1,125 @@
+import pytest
+import numpy as np
+
+from sigfeat.base import Feature
+from sigfeat.extractor import Extractor
+from sigfeat.parallel import source_length
+from sigfeat.source.array import ArraySource
+from sigfeat.sink import DefaultDictSink
+
+
+class Mean(Feature):
+    def process(self, data, result):
+        return np.mean(data[0])
+
+
+class MeanDiff(Feature):
+    _warmup = 1
+
+    def requires(self):
+        yield Mean
+
+    def on_start(self, *args):
+        self._last = 0.0
+
+    def process(self, data, result):
+        diff = result['Mean'] - self._last
+        self._last = result['Mean']
+        return diff
+
+
+def test_source_length():
+    src = ArraySource(np.ones(100), samplerate=1)
+    assert source_length(src) == 100
+
+
+def test_extract_many():
+    sources = [
+        ArraySource(
+            np.random.randn(n),
+            samplerate=1,
+            name=str(n),
+            blocksize=10) for n in (100, 1000, 300)]
+    ex = Extractor(Mean())
+    results = dict(ex.extract_many(sources, workers=2))
+    assert len(results) == 3
+    for src in sources:
+        snk = Extractor(Mean()).extract(src, DefaultDictSink())
+        assert np.allclose(
+            results[src]['results']['Mean'],
+            snk['results']['Mean'])
+
+
+def test_extract_many_soundfiles(tmp_path):
+    from soundfile import write
+    paths = []
+    for n in (2048, 8192):
+        path = str(tmp_path / '{}.wav'.format(n))
+        write(path, np.random.randn(n) * 0.1, 44100)
+        paths.append(path)
+    ex = Extractor(Mean())
+    results = list(ex.extract_many(paths, blocksize=1024, workers=2))
+    assert sorted(src for src, snk in results) == sorted(paths)
+    for src, snk in results:
+        assert len(snk['results']['Mean']) == source_length(src) // 1024
+
+
+def test_extract_chunked():
+    src = ArraySource(
+        np.random.randn(10000),
+        samplerate=1,
+        blocksize=100,
+        overlap=30)
+    ex = Extractor(MeanDiff())
+    assert ex.warmup == 1
+    snk = ex.extract(src, DefaultDictSink())
+    ex = Extractor(MeanDiff())
+    snkc = ex.extract_chunked(src, DefaultDictSink(), chunks=4, workers=2)
+    assert snkc['results']['MeanDiff'] == snk['results']['MeanDiff']
+    assert snkc['results']['Mean'] == snk['results']['Mean']
+    assert snkc['features'].keys() == snk['features'].keys()
+
+
+@pytest.mark.parametrize('batchsize', [None, 4])
+def test_extract_chunked_gated(batchsize):
+    from sigfeat.feature import Peak, Silence
+    x = np.random.randn(10000)
+    x[2000:2500] = 0
+    x[6000:8000] = 0
+    src = ArraySource(x, samplerate=1, blocksize=100, overlap=50)
+
+    def extractor():
+        return Extractor(MeanDiff(), Peak().gated(Silence()))
+    snk = extractor().extract(src, DefaultDictSink(), batchsize=batchsize)
+    snkc = extractor().extract_chunked(
+        src, DefaultDictSink(), chunks=4, workers=2, batchsize=batchsize)
+    skipped = snk['hiddenfeatures']['Silence']['metadata']['skipped']
+    assert skipped == 9 + 39
+    assert snkc['hiddenfeatures']['Silence']['metadata']['skipped'] == (
+        skipped)
+    assert np.allclose(
+        snkc['results']['Peak'], snk['results']['Peak'], equal_nan=True)
+    (_, snkm), = extractor().extract_many([src], workers=1)
+    assert snkm['hiddenfeatures']['Silence']['metadata']['skipped'] == (
+        skipped)
+
+
+def test_extract_chunked_soundfile(tmp_path):
+    from soundfile import write
+    from sigfeat.source.soundfile import SoundFileSource
+    path = str(tmp_path / 'test.wav')
+    write(path, np.random.randn(10000) * 0.1, 44100)
+    ex = Extractor(MeanDiff())
+    snk = ex.extract(
+        SoundFileSource(path, blocksize=1024, overlap=512),
+        DefaultDictSink())
+    ex = Extractor(MeanDiff())
+    snkc = ex.extract_chunked(
+        SoundFileSource(path, blocksize=1024, overlap=512),
+        DefaultDictSink(),
+        chunks=3)
+    assert snkc['results']['MeanDiff'] == snk['results']['MeanDiff']
+
+
+if __name__ == '__main__':
+    pytest.main()  # pragma: no coverage
@@ -0,0 +1,113 @@
+import math
+
+import pytest
+
+from sigfeat.base import Feature
+from sigfeat.base.feature import features_to_featureset
+from sigfeat.base.result import SKIPPED
+from sigfeat.plan import ExtractionPlan
+from sigfeat.source.array import ArraySource
+
+
+class A(Feature):
+    def process(self, data, result):
+        return data[0]
+
+    def process_batch(self, data, results):
+        return [-d for d in data[0]]
+
+
+class B(Feature):
+    def requires(self):
+        yield A()
+
+    def process(self, data, result):
+        return result['A'] + 1
+
+
+class Negative(Feature):
+    def process(self, data, result):
+        return data[0] < 0
+
+
+class Hidden(Feature):
+    _hidden = True
+    skipped = 0
+
+    def process(self, data, result):
+        return data[0] * 10
+
+    def skip(self, data, result):
+        self.skipped += 1
+        return super(Hidden, self).skip(data, result)
+
+
+class C(Feature):
+    def requires(self):
+        yield Hidden()
+
+    def process(self, data, result):
+        return result['Hidden'] + 1
+
+
+def test_extraction_plan():
+    fset = features_to_featureset([A().hide(), B()])
+    plan = ExtractionPlan(fset)
+    assert plan.visible == ('B',)
+    result = plan((1, 0))
+    assert result == {'A': 1, 'B': 2}
+    with pytest.raises(TypeError):
+        result['A'] = 2
+    assert plan.visible_results(result) == {'B': 2}
+
+
+def test_extraction_plan_batch():
+    fset = features_to_featureset([A(), B()])
+    plan = ExtractionPlan(fset, batch=True)
+    results = plan(([1, 2], [0, 1]))
+    assert results['A'] == [-1, -2]
+    assert results['B'] == [0, -1]
+
+
+@pytest.mark.parametrize('batch', [False, True])
+def test_extraction_plan_gated(batch):
+    fset = features_to_featureset(
+        [C().gated(Negative(), fill=None), B()])
+    assert fset.gating() == {'C': 'Negative', 'Hidden': 'Negative'}
+    plan = ExtractionPlan(fset, batch=batch)
+    data = [1, -2, 3]
+    if batch:
+        results = [plan((data, [0, 1, 2]))]
+        results = [{k: v[i] for k, v in results[0].items()}
+                   for i in range(3)]
+    else:
+        results = [plan((d, i)) for i, d in enumerate(data)]
+    assert [r['C'] for r in results] == [11, None, 31]
+    assert [r['Hidden'] for r in results[::2]] == [10, 30]
+    assert math.isnan(results[1]['Hidden'])
+    assert fset['Hidden'].skipped == 1
+
+
+@pytest.mark.parametrize('batch', [False, True])
+def test_extraction_plan_decimated(batch):
+    fset = features_to_featureset([C(every=2), B()])
+    assert fset.decimation() == {
+        'C': 'Decimation', 'C_index': 'Decimation', 'Hidden': 'Decimation'}
+    fset['Decimation'].on_start(ArraySource([], 1, blocksize=1), fset, None)
+    plan = ExtractionPlan(fset, batch=batch)
+    assert plan.visible == ('A', 'B')
+    assert plan.compact == ('C', 'C_index')
+    if batch:
+        results = plan(([1, 2, 3], [0, 1, 2]))
+        assert results['C'] == [11, SKIPPED, 31]
+        assert results['C_index'] == [0, SKIPPED, 2]
+    else:
+        results = [plan((d, i)) for i, d in enumerate([1, 2, 3])]
+        assert [plan.visible_results(r) for r in results] == [
+            {'A': 1, 'B': 2, 'C': 11, 'C_index': 0},
+            {'A': 2, 'B': 3},
+            {'A': 3, 'B': 4, 'C': 31, 'C_index': 2}]
+
+
+if __name__ == '__main__':
+    pytest.main()  # pragma: no coverage
@@ -0,0 +1,47 @@
+import pytest
+
+from sigfeat.base import Feature
+from sigfeat.extractor import Extractor
+from sigfeat.profiling import Timer
+from sigfeat.source.array import ArraySource
+from sigfeat.sink import DefaultDictSink
+
+
+class A(Feature):
+    def process(self, data, result):
+        return data[1]
+
+
+def test_timer():
+    timer = Timer()
+    assert timer.timed(abs)(-1) == 1
+    assert list(timer.iterate(range(3))) == [0, 1, 2]
+    assert timer.as_dict()['calls'] == 4
+    assert timer.time > 0
+
+
+def test_extract_profile():
+    src = ArraySource(list(range(10)), samplerate=1, blocksize=1)
+    snk = Extractor(A()).extract(src, DefaultDictSink())
+    assert 'profile' not in snk
+
+    for batchsize, threads, calls in ((None, None, 10), (4, None, 3),
+                                      (None, 2, 10)):
+        snk = Extractor(A(), A(name='B').hide()).extract(
+            src,
+            DefaultDictSink(),
+            batchsize=batchsize,
+            threads=threads,
+            profile=True)
+        profile = snk['profile']
+        assert profile['features']['A']['calls'] == calls
+        assert profile['features']['B']['calls'] == calls
+        assert profile['source']['calls'] == calls
+        assert profile['sink']['calls'] == 10
+
+    with pytest.raises(ValueError):
+        Extractor(A()).extract(src, profile=True)
+
+
+if __name__ == '__main__':
+    pytest.main()  # pragma: no coverage
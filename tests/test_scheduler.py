@@ -0,0 +1,110 @@
+import pytest
+import numpy as np
+
+from sigfeat.base import Feature
+from sigfeat.base.feature import features_to_featureset
+from sigfeat.extractor import Extractor
+from sigfeat.scheduler import FeatureGraph
+from sigfeat.source.array import ArraySource
+from sigfeat.sink import DefaultDictSink
+
+
+class Square(Feature):
+    def process(self, data, result):
+        return data[0] ** 2
+
+
+class SumSquare(Feature):
+    def requires(self):
+        yield Square
+
+    def process(self, data, result):
+        return np.sum(result['Square'])
+
+
+class Max(Feature):
+    def process(self, data, result):
+        return np.max(data[0])
+
+
+class Ratio(Feature):
+    def requires(self):
+        yield SumSquare()
+        yield Max()
+
+    def process(self, data, result):
+        return result['Max'] / result['SumSquare']
+
+
+def test_feature_graph():
+    graph = FeatureGraph(features_to_featureset([Ratio()], autoinst=True))
+    assert sorted(graph.roots) == ['Max', 'Square']
+    assert graph.requirements['Ratio'] == {'SumSquare', 'Max'}
+    assert graph.dependents['Square'] == ['SumSquare']
+
+
+def test_extract_threaded():
+    src = ArraySource(np.random.randn(1000), samplerate=1, blocksize=10)
+    snk = Extractor(Ratio()).extract(src, DefaultDictSink())
+    for batchsize in (None, 7):
+        snkt = Extractor(Ratio()).extract(
+            src, DefaultDictSink(), batchsize=batchsize, threads=2)
+        for name in ('Ratio', 'Max', 'SumSquare'):
+            assert np.allclose(
+                snk['results'][name], snkt['results'][name])
+
+
+@pytest.mark.parametrize('batchsize', [None, 4])
+def test_extract_threaded_gated(batchsize):
+    from sigfeat.feature import MFCC, Peak, Silence
+    x = np.random.randn(16*1024)
+    x[4*1024:8*1024] = 0
+    src = ArraySource(x, samplerate=44100, blocksize=1024)
+    features = [MFCC().gated(Silence()), Peak()]
+    graph = FeatureGraph(features_to_featureset(features, autoinst=True))
+    assert 'Silence' in graph.requirements['Rfft']
+    snk = Extractor(*features).extract(
+        src, DefaultDictSink(), batchsize=batchsize)
+    snkt = Extractor(*[f.new() for f in features]).extract(
+        src, DefaultDictSink(), batchsize=batchsize, threads=2)
+    for name in ('MFCC', 'Peak'):
+        assert len(snk['results'][name]) == len(snkt['results'][name])
+        for a, b in zip(snk['results'][name], snkt['results'][name]):
+            assert np.allclose(a, b, equal_nan=True)
+
+
+@pytest.mark.parametrize('batchsize', [None, 4])
+def test_extract_threaded_decimated(batchsize):
+    from sigfeat.feature import MFCC, Peak
+    src = ArraySource(
+        np.random.randn(16*1024), samplerate=44100, blocksize=1024)
+    features = [MFCC(every=4), Peak()]
+    graph = FeatureGraph(features_to_featureset(features, autoinst=True))
+    assert 'Decimation' in graph.requirements['Rfft']
+    snk = Extractor(*features).extract(
+        src, DefaultDictSink(), batchsize=batchsize)
+    snkt = Extractor(*[f.new() for f in features]).extract(
+        src, DefaultDictSink(), batchsize=batchsize, threads=2)
+    for name in ('MFCC', 'MFCC_index', 'Peak'):
+        assert np.allclose(snk['results'][name], snkt['results'][name])
+
+
+@pytest.mark.parametrize('threads', [None, 2])
+def test_extract_batches_decimated_factors(threads):
+    from sigfeat.feature import MFCC, Peak, SpectralCentroid
+
+    def features():
+        return [MFCC(every=3), SpectralCentroid(every=2), Peak()]
+    src = ArraySource(
+        np.random.randn(40*512), samplerate=44100, blocksize=512)
+    snk = Extractor(*features()).extract(src, DefaultDictSink())
+    for _ in range(5):
+        snkb = Extractor(*features()).extract(
+            src, DefaultDictSink(), batchsize=8, threads=threads)
+        for name in ('MFCC', 'MFCC_index', 'SpectralCentroid',
+                     'SpectralCentroid_index', 'Peak'):
+            assert np.allclose(snk['results'][name], snkb['results'][name])
+
+
+if __name__ == '__main__':
+    pytest.main()  # pragma: no coverage
@@ -26,5 +26,23 @@ def test_default_dict_sink():
     assert dds['results']['test'] == ['result', '1']
 
 
+def test_hdf5_sink_decimated(tmp_path):
+    pytest.importorskip('h5py')
+    import numpy as np
+    from sigfeat.extractor import Extractor
+    from sigfeat.feature import Index
+    from sigfeat.sink.hdf5 import Hdf5Sink
+    from sigfeat.source.array import ArraySource
+    src = ArraySource(
+        np.random.randn(10000), samplerate=8000, blocksize=1000)
+    snk = Hdf5Sink(str(tmp_path / 'test.h5'), 'w')
+    Extractor(Index(), Index(name='Every3', every=3)).extract(src, snk)
+    snk.tighten_length()
+    assert list(snk['Index'][:, 0]) == list(range(0, 10000, 1000))
+    assert list(snk['Every3'][:, 0]) == list(range(0, 10000, 3000))
+    assert list(snk['Every3_index'][:, 0]) == list(range(0, 10000, 3000))
+    snk.close()
+
+
 if __name__ == '__main__':
     pytest.main()  # pragma: no coverage
@@ -1,4 +1,5 @@
 import pytest
+import numpy as np
 from sigfeat.base import Source
 from sigfeat.source.soundfile import SoundFileSource
 from sigfeat.source.array import ArraySource
@@ -32,6 +33,70 @@ def test_array_source():
         last = data[-1]
 
 
+def test_source_generate_batches():
+    a = ArraySource(
+        list(range(10)),
+        blocksize=2,
+        overlap=1,
+        samplerate=1)
+    batches = list(a.generate_batches(4))
+    assert [len(b[0]) for b in batches] == [4, 4, 1]
+    blocks, indices = batches[0]
+    assert blocks.shape == (4, 2)
+    assert list(indices) == [0, 1, 2, 3]
+
+
+def test_array_source_frames():
+    x = np.arange(20.0).reshape(10, 2)
+    a = ArraySource(x, blocksize=4, overlap=2, samplerate=1)
+    frames = a.frames()
+    assert frames.shape == (4, 4, 2)
+    assert np.shares_memory(frames, x)
+    assert not frames.flags.writeable
+    assert np.all(frames[1] == x[2:6])
+
+
+@pytest.mark.parametrize('tail, lengths', [
+    ('drop', [4, 4, 4]),
+    ('pad', [4, 4, 4, 4]),
+    ('partial', [4, 4, 4, 2]),
+])
+def test_array_source_tail(tail, lengths):
+    x = np.arange(11.0)
+    a = ArraySource(x, blocksize=4, overlap=1, samplerate=1, tail=tail)
+    blocks = list(a)
+    assert [len(b) for b, i in blocks] == lengths
+    assert [i for b, i in blocks] == [0, 3, 6, 9][:len(lengths)]
+    assert a.framecount() == len(lengths)
+    if tail == 'pad':
+        assert list(blocks[-1][0]) == [9, 10, 0, 0]
+    for batchsize in (1, 2, 3):
+        batched = [
+            (list(b), i) for bs, ids in a.generate_batches(batchsize)
+            for b, i in zip(bs, ids)]
+        assert batched == [(list(b), i) for b, i in blocks]
+
+
+def test_array_source_invalid_tail():
+    with pytest.raises(ValueError):
+        ArraySource(np.zeros(8), samplerate=1, tail='wrap')
+
+
+def test_array_source_chunk():
+    a = ArraySource(
+        list(range(20)),
+        blocksize=4,
+        overlap=1,
+        samplerate=1)
+    blocks = list(a)
+    assert a.framecount() == len(blocks)
+    chunk = a.chunk(2, 5)
+    for (blk, idx), (cblk, cidx) in zip(blocks[2:5], chunk):
+        assert idx == cidx
+        assert list(blk) == list(cblk)
+    assert chunk.framecount() == 3
+
+
 def create_soundfile():
     import numpy as np
     from io import BytesIO
@@ -58,5 +123,153 @@ def test_sound_file_source():
     with pytest.raises(Exception):
         src = SoundFileSource('asdlfjhhj987.warv')
 
+
+def test_sound_file_source_chunk(tmp_path):
+    import numpy as np
+    from soundfile import write
+    path = str(tmp_path / 'test.wav')
+    write(path, np.random.randn(10000) * 0.1, 44100)
+    src = SoundFileSource(path, blocksize=1024, overlap=300)
+    count = src.framecount()
+    chunks = [src.chunk(0, 4), src.chunk(4, count)]
+    blocks = list(src)
+    assert count == len(blocks)
+    chunked = [data for chunk in chunks for data in chunk]
+    assert len(chunked) == len(blocks)
+    for (blk, idx), (cblk, cidx) in zip(blocks, chunked):
+        assert idx == cidx
+        assert np.array_equal(blk, cblk)
+
+
+def test_sound_file_source_pickle(tmp_path):
+    import pickle
+    import numpy as np
+    from soundfile import write
+    path = str(tmp_path / 'test.wav')
+    write(path, np.random.randn(4096), 44100)
+    src = SoundFileSource(path, blocksize=1024)
+    src.sf.seek(1024)
+    src2 = pickle.loads(pickle.dumps(src))
+    assert src2.sf.tell() == 1024
+    assert len(list(src2)) == 3
+
+    with pytest.raises(TypeError):
+        pickle.dumps(SoundFileSource(create_soundfile()))
+
+
+@pytest.mark.parametrize('batchsize', [None, 3])
+def test_sound_file_source_prefetch(tmp_path, batchsize):
+    import numpy as np
+    from soundfile import write
+    path = str(tmp_path / 'test.flac')
+    write(path, np.random.randn(10000, 2) * 0.1, 44100)
+    blocks = list(SoundFileSource(path, blocksize=1024, overlap=256))
+    src = SoundFileSource(path, blocksize=1024, overlap=256, prefetch=2)
+    if batchsize:
+        prefetched = [
+            (blk, idx) for blks, idxs in src.generate_batches(batchsize)
+            for blk, idx in zip(blks, idxs)]
+    else:
+        prefetched = list(src)
+    assert len(prefetched) == len(blocks)
+    for (blk, idx), (pblk, pidx) in zip(blocks, prefetched):
+        assert idx == pidx
+        assert np.array_equal(blk, pblk)
+
+
+def test_read_ahead():
+    from sigfeat.source.soundfile import read_ahead
+
+    def failing():
+        yield 1
+        raise RuntimeError('read error')
+
+    with pytest.raises(RuntimeError):
+        list(read_ahead(failing(), 2))
+    blocks = read_ahead(iter(range(100)), 2)
+    assert next(blocks) == 0
+    blocks.close()
+
+
+@pytest.mark.parametrize('batchsize', [None, 2])
+def test_segment_source(tmp_path, batchsize):
+    from soundfile import write
+    from sigfeat.extractor import Extractor
+    from sigfeat.feature import Delta, Index, RootMeanSquare, SpectralFlux
+    from sigfeat.sink import DefaultDictSink
+    from sigfeat.source.soundfile import SegmentSource
+    path = str(tmp_path / 'test.wav')
+    x = np.random.randn(20000) * 0.1
+    write(path, x, 8000, subtype='FLOAT')
+
+    def features():
+        return [Index(), SpectralFlux(), Delta(RootMeanSquare())]
+
+    src = SegmentSource(
+        path, [(1000, 3000), (19800, 25000)], ids=['a', 'c'],
+        blocksize=512, overlap=256)
+    assert src.segments[1] == (19800, 20000)
+    assert src.framecount() == len(list(src))
+    with pytest.raises(ValueError):
+        SegmentSource(path, [(0.5, 0.6)], unit='seconds', ids=[1, 2])
+    with pytest.raises(ValueError):
+        SegmentSource(path, [(0, 1000), (2000, 3000)], ids=[0, 0])
+    sink = Extractor(*features()).extract(
+        SegmentSource(
+            path, [(1000 / 8000, 3000 / 8000), (4000 / 8000, 4800 / 8000)],
+            ids=['a', 'b'], unit='seconds', blocksize=512, overlap=256),
+        DefaultDictSink(),
+        batchsize=batchsize)
+    assert list(sink['segments']) == ['a', 'b']
+    for segment_id, (start, stop) in (('a', (1000, 3000)),
+                                      ('b', (4000, 4800))):
+        expected = Extractor(*features()).extract(
+            ArraySource(x[start:stop], samplerate=8000, offset=start,
+                        blocksize=512, overlap=256, tail='pad'),
+            DefaultDictSink())['results']
+        results = sink['segments'][segment_id]
+        for name in expected:
+            assert np.allclose(results[name], expected[name])
+
+
+def test_segment_source_chunk(tmp_path):
+    from soundfile import write
+    from sigfeat.extractor import Extractor
+    from sigfeat.feature import Delta, Index, RootMeanSquare
+    from sigfeat.sink import DefaultDictSink
+    from sigfeat.source.soundfile import SegmentSource
+    path = str(tmp_path / 'test.wav')
+    write(path, np.random.randn(20000) * 0.1, 8000, subtype='FLOAT')
+
+    def source():
+        return SegmentSource(
+            path, [(1000, 5000), (6000, 6300), (8000, 12000)],
+            ids=['a', 'b', 'c'], blocksize=512, overlap=256)
+
+    blocks = [(index, segment) for _, index, segment in source()]
+    for start, stop in ((0, 5), (5, 17), (14, len(blocks))):
+        chunk = source().chunk(start, stop)
+        assert [(index, segment) for _, index, segment in chunk] == (
+            blocks[start:stop])
+
+    def features():
+        return [Index(), Delta(RootMeanSquare(), width=2)]
+
+    snk = Extractor(*features()).extract(source(), DefaultDictSink())
+    snkc = Extractor(*features()).extract_chunked(
+        source(), DefaultDictSink(), chunks=3, workers=2)
+    assert list(snkc['segments']) == ['a', 'b', 'c']
+    # segment b is too short for a regression delta
+    assert len(snk['segments']['b']['dRootMeanSquare']) == 0
+    for segment_id in snk['segments']:
+        assert len(snk['segments'][segment_id]['Index']) > 0
+        for name in ('Index', 'dRootMeanSquare', 'dRootMeanSquare_index'):
+            assert np.allclose(
+                snkc['segments'][segment_id][name],
+                snk['segments'][segment_id][name])
+    for segment_id in ('a', 'c'):
+        assert len(snk['segments'][segment_id]['dRootMeanSquare']) > 0
+
+
 if __name__ == '__main__':
     pytest.main()  # pragma: no coverage
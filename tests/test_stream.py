@@ -0,0 +1,83 @@
+import pytest
+import numpy as np
+
+from sigfeat.base import Feature
+from sigfeat.extractor import Extractor
+from sigfeat.source.array import ArraySource
+from sigfeat.sink import DefaultDictSink
+from sigfeat.stream import RingBuffer
+
+
+class Sum(Feature):
+    _starts = 0
+
+    def on_start(self, *args):
+        self._starts += 1
+
+    def process(self, data, result):
+        return np.sum(data[0], axis=0)
+
+
+class Index(Feature):
+    def process(self, data, result):
+        return data[1]
+
+
+@pytest.mark.parametrize('channels', [1, 2])
+def test_stream(channels):
+    x = np.random.randn(1000, channels).squeeze()
+    snk = Extractor(Sum(), Index()).extract(
+        ArraySource(x, samplerate=1, blocksize=64, overlap=16),
+        DefaultDictSink())
+    ex = Extractor(Sum(), Index())
+    stream = ex.open_stream(1, channels, 64, 16, sink=DefaultDictSink())
+    results = []
+    for chunk in np.array_split(x, [5, 5, 100, 300, 301, 700]):
+        results += stream.push(chunk)
+    stream.close()
+    assert ex.featureset['Sum']._starts == 1
+    assert [r['Index'] for r in results] == snk['results']['Index']
+    assert np.allclose([r['Sum'] for r in results], snk['results']['Sum'])
+    assert stream.sink['results']['Index'] == snk['results']['Index']
+    assert 'features' in stream.sink
+
+
+def test_stream_shared_ring():
+    x = np.random.randn(1000)
+    ring = RingBuffer(64)
+    streams = [
+        Extractor(Sum(), Index()).open_stream(
+            1, 1, blocksize, overlap, ring=ring)
+        for blocksize, overlap in ((64, 16), (16, 0))]
+    results = [[], []]
+    start = 0
+    while start < len(x):
+        stop = start + min(len(x) - start, *(s.missing for s in streams))
+        ring.write(x[start:stop])
+        start = stop
+        for stream, res in zip(streams, results):
+            res += stream.pull()
+    for (blocksize, overlap), res in zip(((64, 16), (16, 0)), results):
+        snk = Extractor(Sum(), Index()).extract(
+            ArraySource(x, samplerate=1, blocksize=blocksize,
+                        overlap=overlap),
+            DefaultDictSink())
+        assert [r['Index'] for r in res] == snk['results']['Index']
+        assert np.allclose([r['Sum'] for r in res], snk['results']['Sum'])
+    with pytest.raises(ValueError):
+        Extractor(Sum()).open_stream(1, 1, 128, ring=ring)
+
+
+def test_stream_errors():
+    ex = Extractor(Sum())
+    with pytest.raises(ValueError):
+        ex.open_stream(1, 1, 64, 64)
+    with ex.open_stream(1, 1, 4) as stream:
+        assert stream.push(np.ones(3)) == []
+        assert len(stream.push(np.ones(6))) == 2
+        with pytest.raises(TypeError):
+            list(stream)
+
+
+if __name__ == '__main__':
+    pytest.main()  # pragma: no coverage